@@ -13,6 +13,43 @@ class Settings(BaseSettings):
     # File Upload
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
+    STORAGE_GC_BATCH_SIZE: int = 500
+    STORAGE_GC_GRACE_SECONDS: int = 3600  # Unreferenced files younger than this may be in-flight uploads
+    
+    # Storage Backend
+    STORAGE_BACKEND: str = "local"  # local, s3
+    STORAGE_CACHE_DIR: str = "storage_cache"  # Local copies of remote blobs
+    STORAGE_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024  # 2GB
+    S3_BUCKET: str = ""
+    S3_PREFIX: str = ""
+    S3_ENDPOINT_URL: str = ""  # e.g. http://localhost:9000 for MinIO
+    S3_REGION: str = "us-east-1"
+    S3_ACCESS_KEY_ID: str = ""
+    S3_SECRET_ACCESS_KEY: str = ""
+    
+    # Background Jobs
+    JOB_WORKERS: int = 2  # 0 disables the in-process worker pool
+    JOB_LEASE_SECONDS: int = 60
+    JOB_POLL_INTERVAL: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: int = 10
+    
+    # Data Quality (ingest-time checks and canonical series)
+    QUALITY_GAP_FILL: str = "zero"  # zero, ffill, interpolate, none
+    QUALITY_DUPLICATE_POLICY: str = "sum"  # sum, mean, last
+    QUALITY_OUTLIER_THRESHOLD: float = 3.5  # Robust z-score
+    QUALITY_MAX_CELLS: int = 20_000_000  # series x periods of the canonical table
+    
+    # Approximate analysis (stratified sample built at ingest)
+    SAMPLE_FRACTION: float = 0.01
+    SAMPLE_MIN_PER_STRATUM: int = 30
+    SAMPLE_MAX_ROWS: int = 200_000
+    ANALYSIS_APPROX_BUDGET_MS: int = 250
+    
+    # Backtesting
+    BACKTEST_PROCESSES: int = 0  # 0 uses one process per CPU
+    BACKTEST_CHUNK_SIZE: int = 1000  # series per pool task
+    BACKTEST_PARALLEL_MIN_CELLS: int = 250_000_000  # series x periods x folds before using the pool
     
     # CORS
     CORS_ORIGINS: list = ["http://localhost:3000"]
@@ -33,4 +33,10 @@ def get_current_active_user(current_user = Depends(get_current_user)):
     """Get current active user"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user 
\ No newline at end of file
+    return current_user
+
+def get_current_admin_user(current_user = Depends(get_current_active_user)):
+    """Get current user, who must be an operator"""
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    return current_user
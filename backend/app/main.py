@@ -1,10 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
-from .routes import auth_router, projects_router, datasets_router
+from .database import engine, Base, add_missing_columns
+from .config import settings
+from .routes import auth_router, projects_router, datasets_router, jobs_router, forecasting_router
+from .services.jobs import worker_pool
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+add_missing_columns()
 
 # Create FastAPI app
 app = FastAPI(
@@ -25,6 +28,19 @@ app.add_middleware(
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 app.include_router(projects_router, prefix="/projects", tags=["Projects"])
 app.include_router(datasets_router, tags=["Datasets"])
+app.include_router(jobs_router, tags=["Jobs"])
+app.include_router(forecasting_router, tags=["Forecasting"])
+
+@app.on_event("startup")
+async def start_job_workers():
+    """Start background job workers"""
+    if settings.JOB_WORKERS > 0:
+        worker_pool.start()
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    """Stop background job workers; unfinished jobs are reclaimed after their lease expires"""
+    worker_pool.stop()
 
 @app.get("/")
 async def root():
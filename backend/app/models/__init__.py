@@ -3,5 +3,8 @@ from .user import User
 from .project import Project
 from .dataset import Dataset
 from .permission import ProjectPermission
+from .job import Job
+from .storage import StorageTombstone
+from .forecast import ForecastArtifact
 
-__all__ = ["User", "Project", "Dataset", "ProjectPermission"] 
\ No newline at end of file
+__all__ = ["User", "Project", "Dataset", "ProjectPermission", "Job", "StorageTombstone", "ForecastArtifact"] 
\ No newline at end of file
@@ -15,6 +15,7 @@ class Dataset(Base):
     file_type = Column(String)  # csv, excel, etc.
     row_count = Column(Integer)  # Number of rows
     column_count = Column(Integer)  # Number of columns
+    content_hash = Column(String)  # SHA-256 of the file, used for ETags
     uploaded_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
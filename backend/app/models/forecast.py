@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, DateTime, Integer, Float
+from datetime import datetime
+from ..database import Base
+
+class ForecastArtifact(Base):
+    """Current fitted forecast parameters of a dataset"""
+    __tablename__ = "forecast_artifacts"
+    
+    dataset_id = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False)
+    storage_prefix = Column(String, nullable=False)  # Key prefix of the parameter arrays
+    series_count = Column(Integer)
+    season_length = Column(Integer)
+    damping = Column(Float)
+    frequency = Column(String)  # Pandas offset between periods, e.g. "1D"
+    last_date = Column(DateTime)  # Last observed period
+    fitted_at = Column(DateTime, default=datetime.utcnow)
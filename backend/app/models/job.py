@@ -0,0 +1,35 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Float, Boolean, Text
+from datetime import datetime
+from ..database import Base
+import uuid
+
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(String, nullable=False, index=True)  # profile_dataset, backtest, ...
+    payload = Column(Text)  # JSON string of handler arguments
+    status = Column(String, default="queued", index=True)  # queued, running, succeeded, failed, cancelled
+    progress = Column(Float, default=0.0)  # 0.0 - 1.0
+    message = Column(String)
+    result = Column(Text)  # JSON string written by the handler
+    error = Column(Text)
+    
+    # Retries
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    run_after = Column(DateTime, default=datetime.utcnow)
+    
+    # Lease held by the worker currently running the job
+    lease_owner = Column(String)
+    lease_expires_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+    cancel_requested = Column(Boolean, default=False)
+    
+    created_by = Column(String, ForeignKey("users.id"))
+    project_id = Column(String, ForeignKey("projects.id"))
+    dataset_id = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
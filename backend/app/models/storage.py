@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+from ..database import Base
+
+class StorageTombstone(Base):
+    """File of a deleted dataset waiting for the storage GC"""
+    __tablename__ = "storage_tombstones"
+    
+    dataset_id = Column(String, primary_key=True)
+    project_id = Column(String)
+    file_path = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
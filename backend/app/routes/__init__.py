@@ -2,5 +2,7 @@
 from .auth import router as auth_router
 from .projects import router as projects_router
 from .datasets import router as datasets_router
+from .jobs import router as jobs_router
+from .forecasting import router as forecasting_router
 
-__all__ = ["auth_router", "projects_router", "datasets_router"] 
\ No newline at end of file
+__all__ = ["auth_router", "projects_router", "datasets_router", "jobs_router", "forecasting_router"] 
\ No newline at end of file
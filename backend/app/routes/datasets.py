@@ -1,22 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
-import pandas as pd
+from starlette.concurrency import run_in_threadpool
+from typing import List, Literal, Optional
 import os
 import uuid
+import hashlib
 from datetime import datetime
+from pandas.tseries.frequencies import to_offset
 
 from ..database import get_db
-from ..dependencies import get_current_user
+from ..dependencies import get_current_user, get_current_admin_user
 from ..models.user import User
 from ..models.project import Project
 from ..models.dataset import Dataset
 from ..models.permission import ProjectPermission
-from ..schemas.dataset import DatasetCreate, DatasetResponse, DatasetList
+from ..models.job import Job
+from ..schemas.dataset import DatasetCreate, DatasetResponse, DatasetList, DatasetBulkRequest, QualityRequest
+from ..schemas.project import BulkResult
+from ..schemas.job import JobResponse
 from ..config import settings
+from ..utils.http_cache import make_etag, is_not_modified, not_modified, set_cache_headers, PRIVATE_IMMUTABLE
+from ..services.datasets import load_dataframe, read_dataframe, detect_series_columns
+from ..services.storage import storage
+from ..services.analysis import analyze_dataframe, read_profile
+from ..services.jobs import enqueue_job
+from ..services.quality import read_quality_report, load_canonical_series
+from ..services.sampling import load_sample, approximate_analysis
+from ..services.storage_gc import delete_datasets, schedule_gc
+from .jobs import job_to_response
 
 router = APIRouter()
 
+def dataset_etag(dataset: Dataset, variant: str) -> str:
+    # Datasets never change after upload; rows from before content hashing
+    # fall back to upload metadata
+    content = dataset.content_hash or f"{dataset.file_size}:{dataset.uploaded_at.isoformat()}"
+    return make_etag(dataset.id, content, variant)
+
 @router.post("/projects/{project_id}/datasets/upload", response_model=DatasetResponse)
 async def upload_dataset(
     project_id: str,
@@ -51,27 +72,28 @@ async def upload_dataset(
             detail=f"File type not supported. Allowed: {', '.join(allowed_extensions)}"
         )
     
-    # Create upload directory if not exists
-    upload_dir = os.path.join(settings.UPLOAD_DIR, project_id)
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    # Generate unique filename
+    # Generate unique storage key
     file_id = str(uuid.uuid4())
     file_extension = os.path.splitext(file.filename)[1]
-    filename = f"{file_id}{file_extension}"
-    file_path = os.path.join(upload_dir, filename)
+    file_key = f"{project_id}/{file_id}{file_extension}"
+    
+    hasher = hashlib.sha256()
+    
+    async def upload_chunks():
+        while True:
+            chunk = await file.read(1024 * 1024)
+            if not chunk:
+                break
+            hasher.update(chunk)
+            yield chunk
     
     try:
         # Save file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        file_size = await storage.write_stream(file_key, upload_chunks())
         
         # Read and validate data
-        if file_extension == '.csv':
-            df = pd.read_csv(file_path)
-        else:
-            df = pd.read_excel(file_path)
+        file_path = await storage.local_path_async(file_key)
+        df = await run_in_threadpool(read_dataframe, file_path, file_extension[1:])
         
         # Basic validation
         if df.empty:
@@ -85,18 +107,45 @@ async def upload_dataset(
             id=str(uuid.uuid4()),
             project_id=project_id,
             name=name,
-            file_path=file_path,
-            file_size=len(content),
+            file_path=file_key,
+            file_size=file_size,
             file_type=file_extension[1:],  # Remove dot
             row_count=len(df),
             column_count=len(df.columns),
+            content_hash=hasher.hexdigest(),
             uploaded_at=datetime.utcnow()
         )
         
         db.add(dataset)
+        project.updated_at = datetime.utcnow()
         db.commit()
         db.refresh(dataset)
         
+        # Sample for approximate analysis
+        enqueue_job(
+            db,
+            "build_sample",
+            {"dataset_id": dataset.id},
+            created_by=current_user.id,
+            project_id=project_id,
+            dataset_id=dataset.id
+        )
+        
+        # Time series datasets get a quality pass and canonical series
+        try:
+            detect_series_columns(df)
+        except ValueError:
+            pass
+        else:
+            enqueue_job(
+                db,
+                "quality_check",
+                {"dataset_id": dataset.id},
+                created_by=current_user.id,
+                project_id=project_id,
+                dataset_id=dataset.id
+            )
+        
         return DatasetResponse(
             id=dataset.id,
             name=dataset.name,
@@ -109,13 +158,14 @@ async def upload_dataset(
         
     except Exception as e:
         # Clean up file if error
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        await storage.delete_async(file_key)
         raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
 
 @router.get("/projects/{project_id}/datasets/", response_model=DatasetList)
 async def get_project_datasets(
     project_id: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -135,6 +185,14 @@ async def get_project_datasets(
     if not permission and project.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="No permission to view this project")
     
+    count, last_upload = db.query(func.count(Dataset.id), func.max(Dataset.uploaded_at)).filter(
+        Dataset.project_id == project_id
+    ).one()
+    etag = make_etag(project_id, project.updated_at.isoformat(), count, last_upload)
+    if is_not_modified(request, etag, project.updated_at):
+        return not_modified(etag, project.updated_at)
+    set_cache_headers(response, etag, project.updated_at)
+    
     datasets = db.query(Dataset).filter(Dataset.project_id == project_id).all()
     
     return DatasetList(
@@ -154,6 +212,8 @@ async def get_project_datasets(
 @router.get("/datasets/{dataset_id}/preview")
 async def get_dataset_preview(
     dataset_id: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -173,12 +233,14 @@ async def get_dataset_preview(
     if not permission and project.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="No permission to view this dataset")
     
+    etag = dataset_etag(dataset, "preview")
+    if is_not_modified(request, etag, dataset.uploaded_at):
+        return not_modified(etag, dataset.uploaded_at, PRIVATE_IMMUTABLE)
+    set_cache_headers(response, etag, dataset.uploaded_at, PRIVATE_IMMUTABLE)
+    
     try:
         # Read data
-        if dataset.file_type == 'csv':
-            df = pd.read_csv(dataset.file_path)
-        else:
-            df = pd.read_excel(dataset.file_path)
+        df = await run_in_threadpool(load_dataframe, dataset)
         
         # Get first 5 rows
         preview_data = df.head(5).to_dict('records')
@@ -193,13 +255,41 @@ async def get_dataset_preview(
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error reading dataset: {str(e)}")
 
+def latest_dataset_job(db: Session, dataset: Dataset, kind: str, statuses: tuple) -> Optional[Job]:
+    return db.query(Job).filter(
+        Job.dataset_id == dataset.id,
+        Job.kind == kind,
+        Job.status.in_(statuses)
+    ).order_by(Job.created_at.desc()).first()
+
+def enqueue_dataset_job(db: Session, dataset: Dataset, kind: str, current_user: User) -> Job:
+    return enqueue_job(
+        db,
+        kind,
+        {"dataset_id": dataset.id},
+        created_by=current_user.id,
+        project_id=dataset.project_id,
+        dataset_id=dataset.id
+    )
+
 @router.get("/datasets/{dataset_id}/analysis")
 async def get_dataset_analysis(
     dataset_id: str,
+    request: Request,
+    response: Response,
+    mode: Literal["exact", "approx"] = "exact",
+    budget_ms: int = Query(settings.ANALYSIS_APPROX_BUDGET_MS, ge=1, le=60000),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get dataset analysis (statistics, charts data)"""
+    """Get dataset analysis (statistics, charts data).
+    
+    With `mode=approx` the answer comes from the stratified sample built at
+    ingest within about `budget_ms`, with confidence intervals and the
+    sampling fraction. A full profile is queued at the same time; once it
+    has finished, approx requests return its exact result instead. Until
+    the sample is built they return 202 with the ids of both jobs.
+    """
     
     dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
     if not dataset:
@@ -215,58 +305,247 @@ async def get_dataset_analysis(
     if not permission and project.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="No permission to view this dataset")
     
-    try:
-        # Read data
-        if dataset.file_type == 'csv':
-            df = pd.read_csv(dataset.file_path)
-        else:
-            df = pd.read_excel(dataset.file_path)
+    if mode == "approx":
+        profile = latest_dataset_job(db, dataset, "profile_dataset", ("queued", "running", "succeeded"))
         
-        # Basic statistics
-        stats = {}
-        for col in df.columns:
-            if df[col].dtype in ['int64', 'float64']:
-                stats[col] = {
-                    "min": float(df[col].min()),
-                    "max": float(df[col].max()),
-                    "mean": float(df[col].mean()),
-                    "std": float(df[col].std()),
-                    "count": int(df[col].count())
-                }
-            else:
-                stats[col] = {
-                    "unique_count": int(df[col].nunique()),
-                    "most_common": df[col].value_counts().head(5).to_dict()
-                }
+        if profile and profile.status == "succeeded":
+            exact = await run_in_threadpool(read_profile, dataset.id)
+            if exact is not None:
+                etag = dataset_etag(dataset, f"analysis-profile:{profile.id}")
+                if is_not_modified(request, etag, profile.finished_at):
+                    return not_modified(etag, profile.finished_at, PRIVATE_IMMUTABLE)
+                set_cache_headers(response, etag, profile.finished_at, PRIVATE_IMMUTABLE)
+                return {**exact, "mode": "exact", "exact": True}
+            # Profiles from before they were stored separately: run it again
+            profile = None
         
-        # Time series analysis (if date column exists)
-        time_series_data = None
-        date_columns = []
-        for col in df.columns:
-            if 'date' in col.lower() or 'time' in col.lower():
-                date_columns.append(col)
+        if profile is None:
+            profile = enqueue_dataset_job(db, dataset, "profile_dataset", current_user)
         
-        if date_columns:
-            # Use first date column for time series
-            date_col = date_columns[0]
-            try:
-                df[date_col] = pd.to_datetime(df[date_col])
-                time_series_data = df.sort_values(date_col).to_dict('records')
-            except:
-                pass
+        # Superseded by the exact result, so never cached
+        response.headers["Cache-Control"] = "no-store"
+        
+        stored = await run_in_threadpool(load_sample, dataset.id)
+        if stored is None:
+            # Nothing to answer from quickly yet; the caller follows the jobs
+            sample = latest_dataset_job(db, dataset, "build_sample", ("queued", "running"))
+            if sample is None:
+                sample = enqueue_dataset_job(db, dataset, "build_sample", current_user)
+            response.status_code = 202
+            return {
+                "dataset_id": dataset_id,
+                "mode": "pending",
+                "exact": False,
+                "exact_job_id": profile.id,
+                "sample_job_id": sample.id
+            }
+        
+        analysis = await run_in_threadpool(approximate_analysis, *stored, budget_ms)
+        return {"dataset_id": dataset_id, **analysis, "exact_job_id": profile.id}
+    
+    etag = dataset_etag(dataset, "analysis")
+    if is_not_modified(request, etag, dataset.uploaded_at):
+        return not_modified(etag, dataset.uploaded_at, PRIVATE_IMMUTABLE)
+    set_cache_headers(response, etag, dataset.uploaded_at, PRIVATE_IMMUTABLE)
+    
+    try:
+        # Read data
+        df = await run_in_threadpool(load_dataframe, dataset)
         
         return {
             "dataset_id": dataset_id,
-            "columns": df.columns.tolist(),
-            "statistics": stats,
-            "time_series_data": time_series_data,
-            "total_rows": len(df),
-            "total_columns": len(df.columns)
+            **analyze_dataframe(df)
         }
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error analyzing dataset: {str(e)}")
 
+@router.post("/datasets/{dataset_id}/profile", response_model=JobResponse)
+async def profile_dataset(
+    dataset_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Queue a full dataset analysis as a background job"""
+    
+    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    # Check user permission for project
+    project = db.query(Project).filter(Project.id == dataset.project_id).first()
+    permission = db.query(ProjectPermission).filter(
+        ProjectPermission.project_id == dataset.project_id,
+        ProjectPermission.user_id == current_user.id
+    ).first()
+    
+    if not permission and project.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="No permission to view this dataset")
+    
+    job = enqueue_job(
+        db,
+        "profile_dataset",
+        {"dataset_id": dataset.id},
+        created_by=current_user.id,
+        project_id=dataset.project_id,
+        dataset_id=dataset.id
+    )
+    
+    return job_to_response(job)
+
+@router.post("/datasets/{dataset_id}/quality", response_model=JobResponse)
+async def check_dataset_quality(
+    dataset_id: str,
+    request: QualityRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Queue a data-quality pass that rebuilds the canonical series table"""
+    
+    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    # Check user permission for project
+    project = db.query(Project).filter(Project.id == dataset.project_id).first()
+    permission = db.query(ProjectPermission).filter(
+        ProjectPermission.project_id == dataset.project_id,
+        ProjectPermission.user_id == current_user.id
+    ).first()
+    
+    if not permission and project.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="No permission to view this dataset")
+    
+    if request.frequency is not None:
+        try:
+            valid = to_offset(request.frequency).n > 0
+        except ValueError:
+            valid = False
+        if not valid:
+            raise HTTPException(status_code=400, detail=f"Invalid frequency: {request.frequency}")
+    
+    column_fields = ("date_column", "product_column", "demand_column")
+    values = request.model_dump(exclude_none=True)
+    job = enqueue_job(
+        db,
+        "quality_check",
+        {
+            "dataset_id": dataset.id,
+            "columns": {field: value for field, value in values.items() if field in column_fields},
+            **{field: value for field, value in values.items() if field not in column_fields}
+        },
+        created_by=current_user.id,
+        project_id=dataset.project_id,
+        dataset_id=dataset.id
+    )
+    
+    return job_to_response(job)
+
+@router.get("/datasets/{dataset_id}/quality")
+async def get_dataset_quality(
+    dataset_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the latest data-quality report (duplicates, gaps, outliers, invalid values per product)"""
+    
+    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    # Check user permission for project
+    project = db.query(Project).filter(Project.id == dataset.project_id).first()
+    permission = db.query(ProjectPermission).filter(
+        ProjectPermission.project_id == dataset.project_id,
+        ProjectPermission.user_id == current_user.id
+    ).first()
+    
+    if not permission and project.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="No permission to view this dataset")
+    
+    report = await run_in_threadpool(read_quality_report, dataset.id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Quality check has not run for this dataset")
+    
+    return report
+
+@router.get("/datasets/{dataset_id}/series")
+async def get_dataset_series(
+    dataset_id: str,
+    keys: List[str] = Query(default=[]),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the canonical regular series for charts (all products unless `keys` are given)"""
+    
+    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    # Check user permission for project
+    project = db.query(Project).filter(Project.id == dataset.project_id).first()
+    permission = db.query(ProjectPermission).filter(
+        ProjectPermission.project_id == dataset.project_id,
+        ProjectPermission.user_id == current_user.id
+    ).first()
+    
+    if not permission and project.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="No permission to view this dataset")
+    
+    table = await run_in_threadpool(load_canonical_series, dataset.id)
+    if table is None:
+        raise HTTPException(status_code=404, detail="Quality check has not run for this dataset")
+    
+    if keys:
+        table = table[table["key"].isin(keys)]
+    
+    series = {}
+    for key, group in table.groupby("key", sort=False):
+        series[key] = {
+            "dates": group["date"].dt.strftime("%Y-%m-%d").tolist(),
+            "demand": group["demand"].astype(object).where(group["demand"].notna(), None).tolist(),
+            "filled": group["filled"].tolist(),
+            "outlier": group["outlier"].tolist()
+        }
+    
+    return {"dataset_id": dataset.id, "series": series}
+
+@router.get("/datasets/{dataset_id}/profile")
+async def get_dataset_profile(
+    dataset_id: str,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the full analysis written by the profile job"""
+    
+    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    # Check user permission for project
+    project = db.query(Project).filter(Project.id == dataset.project_id).first()
+    permission = db.query(ProjectPermission).filter(
+        ProjectPermission.project_id == dataset.project_id,
+        ProjectPermission.user_id == current_user.id
+    ).first()
+    
+    if not permission and project.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="No permission to view this dataset")
+    
+    # A profile only exists once written and never changes afterwards
+    etag = dataset_etag(dataset, "profile")
+    if is_not_modified(request, etag, dataset.uploaded_at):
+        return not_modified(etag, dataset.uploaded_at, PRIVATE_IMMUTABLE)
+    
+    profile = await run_in_threadpool(read_profile, dataset.id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Dataset has not been profiled")
+    
+    set_cache_headers(response, etag, dataset.uploaded_at, PRIVATE_IMMUTABLE)
+    return profile
+
 @router.delete("/datasets/{dataset_id}")
 async def delete_dataset(
     dataset_id: str,
@@ -290,15 +569,50 @@ async def delete_dataset(
         raise HTTPException(status_code=403, detail="No permission to delete this dataset")
     
     try:
-        # Delete file
-        if os.path.exists(dataset.file_path):
-            os.remove(dataset.file_path)
-        
-        # Delete from database
-        db.delete(dataset)
-        db.commit()
+        # Delete from database; the file is reclaimed by the storage GC
+        delete_datasets(db, [dataset_id])
+        schedule_gc(db, created_by=current_user.id)
         
         return {"message": "Dataset deleted successfully"}
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error deleting dataset: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=f"Error deleting dataset: {str(e)}")
+
+@router.post("/datasets/bulk-delete", response_model=BulkResult)
+async def bulk_delete_datasets(
+    request: DatasetBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Delete many datasets; datasets the user cannot access are skipped"""
+    
+    # Datasets in projects the user owns or has a permission on
+    shared_projects = db.query(ProjectPermission.project_id).filter(
+        ProjectPermission.user_id == current_user.id
+    )
+    allowed = [dataset_id for (dataset_id,) in db.query(Dataset.id).join(Project).filter(
+        Dataset.id.in_(request.dataset_ids),
+        (Project.owner_id == current_user.id) | Project.id.in_(shared_projects)
+    )]
+    processed = set(allowed)
+    skipped = [dataset_id for dataset_id in request.dataset_ids if dataset_id not in processed]
+    
+    if not allowed:
+        return BulkResult(processed=[], skipped=skipped)
+    
+    deleted = delete_datasets(db, allowed)
+    gc_job = schedule_gc(db, created_by=current_user.id)
+    
+    return BulkResult(processed=allowed, skipped=skipped, datasets=deleted, gc_job_id=gc_job.id)
+
+@router.post("/storage/reconcile", response_model=JobResponse)
+async def reconcile_storage(
+    dry_run: bool = True,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Queue a scan for files on disk that no dataset references (and vice versa); admins only"""
+    
+    job = enqueue_job(db, "storage_reconcile", {"dry_run": dry_run}, created_by=current_user.id)
+    
+    return job_to_response(job) 
\ No newline at end of file
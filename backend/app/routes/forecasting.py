@@ -0,0 +1,177 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ..database import get_db
+from ..dependencies import get_current_user
+from ..models.user import User
+from ..models.project import Project
+from ..models.dataset import Dataset
+from ..models.permission import ProjectPermission
+from ..models.forecast import ForecastArtifact
+from ..schemas.job import JobResponse
+from ..schemas.forecast import BacktestRequest, FeatureRequest, ForecastFitRequest, BatchForecastRequest, BatchForecastResponse
+from ..services.backtesting import MODELS, read_backtest
+from ..services.features import read_manifest
+from ..services.forecast_artifacts import load_artifact
+from ..services.jobs import enqueue_job
+from .jobs import job_to_response
+
+router = APIRouter()
+
+def get_dataset_for_user(db: Session, dataset_id: str, current_user: User) -> Dataset:
+    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    # Check user permission for project
+    project = db.query(Project).filter(Project.id == dataset.project_id).first()
+    permission = db.query(ProjectPermission).filter(
+        ProjectPermission.project_id == dataset.project_id,
+        ProjectPermission.user_id == current_user.id
+    ).first()
+    
+    if not permission and project.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="No permission to view this dataset")
+    
+    return dataset
+
+@router.post("/datasets/{dataset_id}/backtest", response_model=JobResponse)
+async def backtest_dataset(
+    dataset_id: str,
+    request: BacktestRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Queue a rolling-origin backtest of the forecasting models"""
+    
+    dataset = get_dataset_for_user(db, dataset_id, current_user)
+    
+    unknown = [model for model in request.models or [] if model not in MODELS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown models: {', '.join(unknown)}. Available: {', '.join(MODELS)}"
+        )
+    
+    job = enqueue_job(
+        db,
+        "backtest",
+        {"dataset_id": dataset.id, **request.model_dump()},
+        created_by=current_user.id,
+        project_id=dataset.project_id,
+        dataset_id=dataset.id
+    )
+    
+    return job_to_response(job)
+
+@router.get("/datasets/{dataset_id}/backtests/{job_id}")
+async def get_backtest_result(
+    dataset_id: str,
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a finished backtest with per-series scores"""
+    
+    dataset = get_dataset_for_user(db, dataset_id, current_user)
+    
+    result = await run_in_threadpool(read_backtest, dataset.id, job_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Backtest result not found")
+    
+    return result
+
+@router.post("/datasets/{dataset_id}/features", response_model=JobResponse)
+async def build_dataset_features(
+    dataset_id: str,
+    request: FeatureRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Queue a build or incremental refresh of the dataset's feature table"""
+    
+    dataset = get_dataset_for_user(db, dataset_id, current_user)
+    
+    spec_fields = ("lags", "windows", "ewm_spans", "price_lags")
+    values = request.model_dump(exclude_none=True)
+    job = enqueue_job(
+        db,
+        "build_features",
+        {
+            "dataset_id": dataset.id,
+            "spec": {field: values[field] for field in spec_fields if field in values},
+            "columns": {field: value for field, value in values.items() if field not in spec_fields}
+        },
+        created_by=current_user.id,
+        project_id=dataset.project_id,
+        dataset_id=dataset.id
+    )
+    
+    return job_to_response(job)
+
+@router.get("/datasets/{dataset_id}/features")
+async def get_dataset_features(
+    dataset_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the manifest of the dataset's current feature table"""
+    
+    dataset = get_dataset_for_user(db, dataset_id, current_user)
+    
+    manifest = read_manifest(dataset.id)
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="Features have not been built for this dataset")
+    
+    return manifest
+
+@router.post("/datasets/{dataset_id}/forecast/fit", response_model=JobResponse)
+async def fit_dataset_forecast(
+    dataset_id: str,
+    request: ForecastFitRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Queue fitting and persisting forecast parameters for every series"""
+    
+    dataset = get_dataset_for_user(db, dataset_id, current_user)
+    
+    job = enqueue_job(
+        db,
+        "fit_forecast",
+        {"dataset_id": dataset.id, **request.model_dump()},
+        created_by=current_user.id,
+        project_id=dataset.project_id,
+        dataset_id=dataset.id
+    )
+    
+    return job_to_response(job)
+
+@router.post("/datasets/{dataset_id}/forecast/batch", response_model=BatchForecastResponse)
+async def batch_forecast(
+    dataset_id: str,
+    request: BatchForecastRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Forecast many series at once from the persisted parameters"""
+    
+    dataset = get_dataset_for_user(db, dataset_id, current_user)
+    
+    artifact = db.query(ForecastArtifact).filter(ForecastArtifact.dataset_id == dataset.id).first()
+    if not artifact:
+        raise HTTPException(status_code=409, detail="Forecast model has not been fitted for this dataset")
+    
+    # First use of a version may fetch the arrays from storage
+    loaded = await run_in_threadpool(load_artifact, artifact)
+    found, missing, forecast, dates = loaded.predict(request.keys, request.horizon)
+    
+    return BatchForecastResponse(
+        dataset_id=dataset.id,
+        version=artifact.version,
+        horizon=request.horizon,
+        dates=dates.to_pydatetime().tolist(),
+        forecasts=dict(zip(found, forecast.round(3).tolist())),
+        missing=missing
+    )
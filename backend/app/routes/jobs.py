@@ -0,0 +1,155 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+import asyncio
+import json
+
+from ..database import get_db, SessionLocal
+from ..dependencies import get_current_user
+from ..models.user import User
+from ..models.job import Job
+from ..models.project import Project
+from ..models.permission import ProjectPermission
+from ..schemas.job import JobResponse, JobList
+from ..services.jobs import request_cancel, job_result, TERMINAL_STATUSES
+
+router = APIRouter()
+
+def job_to_response(job: Job, include_result: bool = True) -> JobResponse:
+    return JobResponse(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        progress=job.progress or 0.0,
+        message=job.message,
+        result=job_result(job) if include_result else None,
+        error=job.error,
+        attempts=job.attempts or 0,
+        max_attempts=job.max_attempts,
+        project_id=job.project_id,
+        dataset_id=job.dataset_id,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at
+    )
+
+def get_user_job(db: Session, job_id: str, current_user: User, manage: bool = False) -> Job:
+    """Job the user may view: their own, or one on a project they can access.
+
+    Jobs on shared datasets are started by whichever member asked first,
+    so other members can follow them; only the creator may manage them.
+    """
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if job.created_by == current_user.id:
+        return job
+
+    if not manage and job.project_id is not None:
+        project = db.query(Project).filter(Project.id == job.project_id).first()
+        permission = db.query(ProjectPermission).filter(
+            ProjectPermission.project_id == job.project_id,
+            ProjectPermission.user_id == current_user.id
+        ).first()
+        if permission or (project and project.owner_id == current_user.id):
+            return job
+
+    raise HTTPException(status_code=403, detail=f"No permission to {'manage' if manage else 'view'} this job")
+
+@router.get("/jobs/", response_model=JobList)
+async def get_jobs(
+    status: Optional[str] = None,
+    dataset_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the current user's jobs, newest first (results via GET /jobs/{id})"""
+    query = db.query(Job).filter(Job.created_by == current_user.id)
+    if status:
+        query = query.filter(Job.status == status)
+    if dataset_id:
+        query = query.filter(Job.dataset_id == dataset_id)
+
+    jobs = query.order_by(Job.created_at.desc()).limit(limit).all()
+    return JobList(jobs=[job_to_response(job, include_result=False) for job in jobs])
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get job status and result"""
+    return job_to_response(get_user_job(db, job_id, current_user))
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Cancel a queued or running job"""
+    job = get_user_job(db, job_id, current_user, manage=True)
+
+    if job.status in TERMINAL_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Job already {job.status}")
+
+    return job_to_response(request_cancel(db, job))
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream job progress as Server-Sent Events until the job finishes"""
+    get_user_job(db, job_id, current_user)
+    # Dependencies are torn down after the response, i.e. when the stream
+    # ends; release the request's connection now
+    db.close()
+
+    async def event_stream():
+        last_state = None
+        idle_polls = 0
+        while True:
+            if await request.is_disconnected():
+                break
+
+            # Short-lived session per poll so the stream holds no connection
+            poll_db = SessionLocal()
+            try:
+                job = poll_db.query(Job).filter(Job.id == job_id).first()
+                data = job_to_response(job).model_dump_json() if job else None
+                status = job.status if job else None
+            finally:
+                poll_db.close()
+
+            if data is None:
+                yield "event: error\ndata: {\"detail\": \"Job not found\"}\n\n"
+                break
+
+            if data != last_state:
+                last_state = data
+                idle_polls = 0
+                yield f"event: progress\ndata: {data}\n\n"
+            else:
+                idle_polls += 1
+                if idle_polls % 30 == 0:
+                    # Keep proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+
+            if status in TERMINAL_STATUSES:
+                yield f"event: done\ndata: {json.dumps({'status': status})}\n\n"
+                break
+
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import datetime
 from ..database import get_db
 from ..models.project import Project
 from ..models.permission import ProjectPermission
-from ..schemas.project import ProjectCreate, ProjectUpdate, Project as ProjectSchema, ProjectList
+from ..schemas.project import ProjectCreate, ProjectUpdate, Project as ProjectSchema, ProjectList, ProjectBulkRequest, BulkResult
 from ..dependencies import get_current_active_user
 from ..models.user import User
+from ..services.storage_gc import delete_projects, schedule_gc
+from ..utils.http_cache import make_etag, is_not_modified, not_modified, set_cache_headers
 
 router = APIRouter(tags=["projects"])
 
@@ -32,12 +36,27 @@ async def create_project(
 
 @router.get("/", response_model=ProjectList)
 async def get_projects(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get user's projects"""
+    # Validator over every project the user can see
+    shared_projects = db.query(ProjectPermission.project_id).filter(
+        ProjectPermission.user_id == current_user.id
+    )
+    count, last_updated = db.query(func.count(Project.id), func.max(Project.updated_at)).filter(
+        or_(Project.owner_id == current_user.id, Project.id.in_(shared_projects)),
+        Project.status == "active"
+    ).one()
+    etag = make_etag(current_user.id, skip, limit, count, last_updated)
+    if is_not_modified(request, etag, last_updated):
+        return not_modified(etag, last_updated)
+    set_cache_headers(response, etag, last_updated)
+    
     # Get projects owned by user
     owned_projects = db.query(Project).filter(
         Project.owner_id == current_user.id,
@@ -129,7 +148,52 @@ async def delete_project(
     if project.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Only project owner can delete project")
     
-    db.delete(project)
+    # Set-based delete; dataset files are reclaimed in the background
+    delete_projects(db, [project_id])
+    schedule_gc(db, created_by=current_user.id)
+    
+    return {"message": "Project deleted successfully"}
+
+@router.post("/bulk-delete", response_model=BulkResult)
+async def bulk_delete_projects(
+    request: ProjectBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Delete many projects; only projects owned by the user are deleted"""
+    owned = [project_id for (project_id,) in db.query(Project.id).filter(
+        Project.id.in_(request.project_ids),
+        Project.owner_id == current_user.id
+    )]
+    processed = set(owned)
+    skipped = [project_id for project_id in request.project_ids if project_id not in processed]
+    
+    if not owned:
+        return BulkResult(processed=[], skipped=skipped)
+    
+    counts = delete_projects(db, owned)
+    gc_job = schedule_gc(db, created_by=current_user.id)
+    
+    return BulkResult(processed=owned, skipped=skipped, datasets=counts["datasets"], gc_job_id=gc_job.id)
+
+@router.post("/bulk-archive", response_model=BulkResult)
+async def bulk_archive_projects(
+    request: ProjectBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Archive many projects; only projects owned by the user are archived"""
+    owned = [project_id for (project_id,) in db.query(Project.id).filter(
+        Project.id.in_(request.project_ids),
+        Project.owner_id == current_user.id
+    )]
+    processed = set(owned)
+    skipped = [project_id for project_id in request.project_ids if project_id not in processed]
+    
+    db.query(Project).filter(Project.id.in_(owned)).update(
+        {Project.status: "archived", Project.updated_at: datetime.utcnow()},
+        synchronize_session=False
+    )
     db.commit()
     
-    return {"message": "Project deleted successfully"} 
\ No newline at end of file
+    return BulkResult(processed=owned, skipped=skipped) 
\ No newline at end of file
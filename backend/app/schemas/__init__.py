@@ -1,10 +1,14 @@
 # Pydantic Schemas
 from .auth import UserCreate, UserLogin, Token, TokenData, User
-from .project import ProjectCreate, ProjectUpdate, Project, ProjectList
-from .dataset import DatasetCreate, Dataset, DatasetResponse, DatasetList
+from .project import ProjectCreate, ProjectUpdate, Project, ProjectList, ProjectBulkRequest, BulkResult
+from .dataset import DatasetCreate, Dataset, DatasetResponse, DatasetList, DatasetBulkRequest, QualityRequest
+from .job import JobResponse, JobList
+from .forecast import BacktestRequest, FeatureRequest, ForecastFitRequest, BatchForecastRequest, BatchForecastResponse
 
 __all__ = [
     "UserCreate", "UserLogin", "Token", "TokenData", "User",
-    "ProjectCreate", "ProjectUpdate", "Project", "ProjectList",
-    "DatasetCreate", "Dataset", "DatasetResponse", "DatasetList"
+    "ProjectCreate", "ProjectUpdate", "Project", "ProjectList", "ProjectBulkRequest", "BulkResult",
+    "DatasetCreate", "Dataset", "DatasetResponse", "DatasetList", "DatasetBulkRequest", "QualityRequest",
+    "JobResponse", "JobList",
+    "BacktestRequest", "FeatureRequest", "ForecastFitRequest", "BatchForecastRequest", "BatchForecastResponse"
 ] 
\ No newline at end of file
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
 from datetime import datetime
 
 class DatasetBase(BaseModel):
@@ -34,4 +34,16 @@ class Dataset(DatasetBase):
     uploaded_at: datetime
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class DatasetBulkRequest(BaseModel):
+    dataset_ids: List[str] = Field(..., min_length=1, max_length=10000)
+
+class QualityRequest(BaseModel):
+    frequency: Optional[str] = None  # inferred when not given, e.g. "D", "W-SUN", "MS"
+    gap_fill: Optional[Literal["zero", "ffill", "interpolate", "none"]] = None
+    duplicate_policy: Optional[Literal["sum", "mean", "last"]] = None
+    outlier_threshold: Optional[float] = Field(None, gt=0)
+    date_column: Optional[str] = None
+    product_column: Optional[str] = None
+    demand_column: Optional[str] = None
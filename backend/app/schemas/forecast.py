@@ -0,0 +1,42 @@
+from pydantic import BaseModel, Field, conint
+from typing import Optional, List, Dict
+from datetime import datetime
+
+class BacktestRequest(BaseModel):
+    horizon: int = Field(7, ge=1)
+    folds: int = Field(12, ge=1)
+    step: Optional[int] = Field(None, ge=1)  # defaults to horizon
+    models: Optional[List[str]] = None  # defaults to all models
+    season_length: int = Field(7, ge=1)
+    date_column: Optional[str] = None
+    product_column: Optional[str] = None
+    demand_column: Optional[str] = None
+
+class FeatureRequest(BaseModel):
+    lags: Optional[List[conint(ge=1)]] = None
+    windows: Optional[List[conint(ge=1)]] = None
+    ewm_spans: Optional[List[conint(ge=1)]] = None
+    price_lags: Optional[List[conint(ge=1)]] = None
+    date_column: Optional[str] = None
+    product_column: Optional[str] = None
+    demand_column: Optional[str] = None
+    price_column: Optional[str] = None
+
+class ForecastFitRequest(BaseModel):
+    season_length: int = Field(7, ge=1)
+    damping: float = Field(0.98, gt=0, le=1)
+    date_column: Optional[str] = None
+    product_column: Optional[str] = None
+    demand_column: Optional[str] = None
+
+class BatchForecastRequest(BaseModel):
+    keys: List[str] = Field(..., min_length=1, max_length=10000)
+    horizon: int = Field(7, ge=1, le=365)
+
+class BatchForecastResponse(BaseModel):
+    dataset_id: str
+    version: int
+    horizon: int
+    dates: List[datetime]
+    forecasts: Dict[str, List[float]]
+    missing: List[str]
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Optional, List, Any
+from datetime import datetime
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str
+    progress: float
+    message: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    project_id: Optional[str] = None
+    dataset_id: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class JobList(BaseModel):
+    jobs: List[JobResponse]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -28,4 +28,13 @@ class Project(ProjectBase):
 
 class ProjectList(BaseModel):
     projects: List[Project]
-    total: int 
\ No newline at end of file
+    total: int 
+
+class ProjectBulkRequest(BaseModel):
+    project_ids: List[str] = Field(..., min_length=1, max_length=1000)
+
+class BulkResult(BaseModel):
+    processed: List[str]
+    skipped: List[str]
+    datasets: int = 0
+    gc_job_id: Optional[str] = None
\ No newline at end of file
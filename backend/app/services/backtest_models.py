@@ -0,0 +1,131 @@
+import warnings
+import numpy as np
+from typing import Callable, Dict, List, Optional
+
+# Imports only numpy: spawned backtest workers load this module, not the app
+
+METRICS = ("mape", "smape", "mase", "bias")
+
+# Every model takes the (n_series, n_periods) matrix and all fold cutoffs at
+# once and returns forecasts shaped (n_series, n_folds, horizon). Stateful
+# models run a single pass over time and read their state at each cutoff, so
+# fitted state is shared by all folds instead of refitting per fold.
+
+def _naive(values: np.ndarray, cutoffs: np.ndarray, horizon: int, season_length: int) -> np.ndarray:
+    last = values[:, cutoffs - 1]
+    return np.repeat(last[:, :, None], horizon, axis=2)
+
+def _seasonal_naive(values: np.ndarray, cutoffs: np.ndarray, horizon: int, season_length: int) -> np.ndarray:
+    steps = np.arange(horizon) % season_length
+    index = cutoffs[:, None] - season_length + steps[None, :]
+    forecast = values[:, np.clip(index, 0, None)]
+    forecast[:, index < 0] = np.nan
+    return forecast
+
+def _moving_average(values: np.ndarray, cutoffs: np.ndarray, horizon: int, season_length: int) -> np.ndarray:
+    window = season_length
+    observed = ~np.isnan(values)
+    sums = np.concatenate([np.zeros((len(values), 1)), np.cumsum(np.where(observed, values, 0.0), axis=1)], axis=1)
+    counts = np.concatenate([np.zeros((len(values), 1)), np.cumsum(observed, axis=1)], axis=1)
+    start = np.clip(cutoffs - window, 0, None)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (sums[:, cutoffs] - sums[:, start]) / (counts[:, cutoffs] - counts[:, start])
+    return np.repeat(mean[:, :, None], horizon, axis=2)
+
+def smoothing_states(values: np.ndarray, alpha: float, beta: Optional[float]):
+    """Level (and trend) after each period, computed for all series at once"""
+    n_series, n_periods = values.shape
+    levels = np.full((n_series, n_periods), np.nan)
+    trends = np.zeros((n_series, n_periods))
+    level = np.full(n_series, np.nan)
+    trend = np.zeros(n_series)
+
+    for t in range(n_periods):
+        y = values[:, t]
+        observed = ~np.isnan(y)
+        fresh = observed & np.isnan(level)
+        update = observed & ~fresh
+
+        previous = level + trend if beta is not None else level
+        new_level = np.where(update, alpha * y + (1 - alpha) * previous, level)
+        new_level = np.where(fresh, y, new_level)
+        if beta is not None:
+            trend = np.where(update, beta * (new_level - level) + (1 - beta) * trend, trend)
+        level = new_level
+
+        levels[:, t] = level
+        trends[:, t] = trend
+
+    return levels, trends
+
+def _ses(values: np.ndarray, cutoffs: np.ndarray, horizon: int, season_length: int) -> np.ndarray:
+    levels, _ = smoothing_states(values, alpha=0.3, beta=None)
+    return np.repeat(levels[:, cutoffs - 1][:, :, None], horizon, axis=2)
+
+def _holt(values: np.ndarray, cutoffs: np.ndarray, horizon: int, season_length: int) -> np.ndarray:
+    levels, trends = smoothing_states(values, alpha=0.3, beta=0.1)
+    steps = np.arange(1, horizon + 1)
+    return levels[:, cutoffs - 1][:, :, None] + trends[:, cutoffs - 1][:, :, None] * steps
+
+MODELS: Dict[str, Callable[[np.ndarray, np.ndarray, int, int], np.ndarray]] = {
+    "naive": _naive,
+    "seasonal_naive": _seasonal_naive,
+    "moving_average": _moving_average,
+    "ses": _ses,
+    "holt": _holt
+}
+
+def make_cutoffs(n_periods: int, horizon: int, folds: int, step: int, min_train: int = 2) -> np.ndarray:
+    """Rolling-origin cutoffs; each fold trains on [0, cutoff) and tests on the next horizon periods"""
+    last = n_periods - horizon
+    cutoffs = last - step * np.arange(folds)[::-1]
+    cutoffs = cutoffs[cutoffs >= min_train]
+    if len(cutoffs) == 0:
+        raise ValueError("Not enough history for the requested horizon and folds")
+    return cutoffs
+
+def _score(values: np.ndarray, cutoffs: np.ndarray, horizon: int, forecast: np.ndarray) -> Dict[str, np.ndarray]:
+    """Per-series metrics over all folds and horizon steps"""
+    index = cutoffs[:, None] + np.arange(horizon)[None, :]
+    actual = values[:, index]
+    error = forecast - actual
+    valid = ~np.isnan(error)
+
+    # MASE scale: in-sample one-step naive error up to each cutoff
+    diffs = np.abs(np.diff(values, axis=1))
+    diff_observed = ~np.isnan(diffs)
+    diff_sums = np.concatenate([np.zeros((len(values), 1)), np.cumsum(np.where(diff_observed, diffs, 0.0), axis=1)], axis=1)
+    diff_counts = np.concatenate([np.zeros((len(values), 1)), np.cumsum(diff_observed, axis=1)], axis=1)
+
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)
+        abs_error = np.abs(error)
+        nonzero = valid & (actual != 0)
+        ape = np.where(nonzero, abs_error / np.abs(actual), np.nan)
+        denom = np.abs(actual) + np.abs(forecast)
+        sape = np.where(valid & (denom > 0), 2 * abs_error / denom, np.nan)
+
+        scale = diff_sums[:, cutoffs - 1] / diff_counts[:, cutoffs - 1]
+        scale = np.where(scale > 0, scale, np.nan)
+        mase = np.nanmean(np.nanmean(np.where(valid, abs_error, np.nan), axis=2) / scale, axis=1)
+
+        return {
+            "mape": 100 * np.nanmean(ape.reshape(len(values), -1), axis=1),
+            "smape": 100 * np.nanmean(sape.reshape(len(values), -1), axis=1),
+            "mase": mase,
+            "bias": np.nanmean(np.where(valid, error, np.nan).reshape(len(values), -1), axis=1)
+        }
+
+def evaluate_chunk(
+    values: np.ndarray,
+    cutoffs: np.ndarray,
+    horizon: int,
+    models: List[str],
+    season_length: int
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """Backtest every model on a block of series; runs inside pool processes"""
+    scores = {}
+    for model in models:
+        forecast = MODELS[model](values, cutoffs, horizon, season_length)
+        scores[model] = _score(values, cutoffs, horizon, forecast)
+    return scores
@@ -0,0 +1,150 @@
+import json
+import os
+import warnings
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from typing import Callable, List, Optional
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.dataset import Dataset
+from .datasets import derived_key, write_derived, read_derived
+from .quality import series_matrix
+from .jobs import job_handler
+from .backtest_models import METRICS, MODELS, make_cutoffs, evaluate_chunk
+
+def _clean(value: float) -> Optional[float]:
+    return None if value is None or np.isnan(value) else round(float(value), 4)
+
+def run_backtest(
+    keys: np.ndarray,
+    values: np.ndarray,
+    horizon: int = 7,
+    folds: int = 12,
+    step: Optional[int] = None,
+    models: Optional[List[str]] = None,
+    season_length: int = 7,
+    processes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    progress: Optional[Callable[[float], None]] = None
+) -> dict:
+    """Rolling-origin backtest of several models across all series.
+
+    Series are split into blocks that are scored for all models and folds
+    with array operations. Blocks run in a process pool only when the work
+    (series x periods x folds) reaches BACKTEST_PARALLEL_MIN_CELLS; below
+    that, starting the workers costs more than it saves.
+    """
+    models = models or list(MODELS.keys())
+    unknown = [model for model in models if model not in MODELS]
+    if unknown:
+        raise ValueError(f"Unknown models: {', '.join(unknown)}")
+
+    cutoffs = make_cutoffs(values.shape[1], horizon, folds, step or horizon)
+    chunk_size = chunk_size or settings.BACKTEST_CHUNK_SIZE
+    if processes is None:
+        large = values.size * len(cutoffs) >= settings.BACKTEST_PARALLEL_MIN_CELLS
+        processes = (settings.BACKTEST_PROCESSES or os.cpu_count() or 1) if large else 1
+    chunks = [(start, min(start + chunk_size, len(values))) for start in range(0, len(values), chunk_size)]
+
+    scores = {model: {metric: np.full(len(values), np.nan) for metric in METRICS} for model in models}
+
+    def collect(bounds, chunk_scores):
+        start, end = bounds
+        for model, metrics in chunk_scores.items():
+            for metric, series_values in metrics.items():
+                scores[model][metric][start:end] = series_values
+
+    if processes <= 1 or len(chunks) == 1:
+        for done, bounds in enumerate(chunks, 1):
+            collect(bounds, evaluate_chunk(values[bounds[0]:bounds[1]], cutoffs, horizon, models, season_length))
+            if progress:
+                progress(done / len(chunks))
+    else:
+        # spawn: the API process runs worker threads, which fork does not copy safely.
+        # Workers only import the numpy-only backtest_models module.
+        with ProcessPoolExecutor(max_workers=min(processes, len(chunks)), mp_context=get_context("spawn")) as pool:
+            futures = {
+                pool.submit(evaluate_chunk, values[start:end], cutoffs, horizon, models, season_length): (start, end)
+                for start, end in chunks
+            }
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    collect(futures[future], future.result())
+                    if progress:
+                        progress(done / len(chunks))
+            except BaseException:
+                # Cancelled or failed: drop blocks that have not started
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        aggregate = {
+            model: {metric: _clean(np.nanmean(scores[model][metric])) for metric in METRICS}
+            for model in models
+        }
+
+    ranked = [model for model in models if aggregate[model]["mase"] is not None]
+    best_model = min(ranked, key=lambda model: aggregate[model]["mase"]) if ranked else None
+
+    return {
+        "horizon": horizon,
+        "folds": len(cutoffs),
+        "models": models,
+        "best_model": best_model,
+        "aggregate": aggregate,
+        "series": [
+            {
+                "key": str(key),
+                "metrics": {
+                    model: {metric: _clean(scores[model][metric][i]) for metric in METRICS}
+                    for model in models
+                }
+            }
+            for i, key in enumerate(keys)
+        ]
+    }
+
+def _backtest_key(dataset_id: str, job_id: str) -> str:
+    return derived_key(dataset_id, "backtests", f"{job_id}.json")
+
+def save_backtest(dataset_id: str, job_id: str, result: dict):
+    """Persist a full backtest result, including per-series scores"""
+    write_derived(_backtest_key(dataset_id, job_id), json.dumps(result).encode())
+
+def read_backtest(dataset_id: str, job_id: str) -> Optional[dict]:
+    data = read_derived(_backtest_key(dataset_id, job_id))
+    return json.loads(data) if data is not None else None
+
+@job_handler("backtest")
+def backtest_job(ctx, payload: dict) -> dict:
+    """Background job: backtest a dataset"""
+    db = SessionLocal()
+    try:
+        dataset = db.query(Dataset).filter(Dataset.id == payload["dataset_id"]).first()
+        if not dataset:
+            raise ValueError("Dataset not found")
+
+        ctx.progress(0.05, "Reading series")
+        keys, dates, values = series_matrix(dataset, payload)
+    finally:
+        db.close()
+
+    ctx.progress(0.1, f"Backtesting {len(keys)} series")
+    result = run_backtest(
+        keys,
+        values,
+        horizon=payload.get("horizon", 7),
+        folds=payload.get("folds", 12),
+        step=payload.get("step"),
+        models=payload.get("models"),
+        season_length=payload.get("season_length", 7),
+        progress=lambda fraction: ctx.progress(0.1 + 0.9 * fraction)
+    )
+
+    # Per-series scores grow with the dataset; the job row keeps the aggregate
+    save_backtest(payload["dataset_id"], ctx.job_id, result)
+    summary = {key: value for key, value in result.items() if key != "series"}
+    return {"dataset_id": payload["dataset_id"], **summary, "series_count": len(result["series"])}
@@ -0,0 +1,100 @@
+import io
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple
+from ..models.dataset import Dataset
+from .storage import storage
+
+# Column name hints for the date + product + demand layout
+DATE_HINTS = ('date', 'time')
+PRODUCT_HINTS = ('product', 'sku', 'item', 'series')
+DEMAND_HINTS = ('demand', 'sales', 'quantity', 'qty', 'units')
+
+def load_dataframe(dataset: Dataset) -> pd.DataFrame:
+    """Read a dataset file into a DataFrame"""
+    return read_dataframe(storage.local_path(dataset.file_path), dataset.file_type)
+
+def read_dataframe(path: str, file_type: str) -> pd.DataFrame:
+    """Read a local CSV/Excel file into a DataFrame"""
+    if file_type == 'csv':
+        return pd.read_csv(path)
+    return pd.read_excel(path)
+
+def derived_key(dataset_id: str, *parts: str) -> str:
+    """Storage key for outputs derived from a dataset (profile, sample, features, ...)"""
+    return "/".join(("derived", dataset_id) + parts)
+
+def write_derived(key: str, data: bytes):
+    """Store a derived output, replacing any previous one"""
+    storage.save(key, io.BytesIO(data))
+
+def read_derived(key: str) -> Optional[bytes]:
+    """Contents of a derived output, or None if it has not been written.
+
+    Read straight from the backend rather than through `local_path`:
+    derived outputs are rewritten in place, and the local cache assumes
+    blobs never change.
+    """
+    if not storage.exists(key):
+        return None
+    return b"".join(storage.iter_chunks(key))
+
+def _find_column(df: pd.DataFrame, hints: Tuple[str, ...]) -> Optional[str]:
+    for col in df.columns:
+        if any(hint in str(col).lower() for hint in hints):
+            return col
+    return None
+
+def detect_series_columns(
+    df: pd.DataFrame,
+    date_column: Optional[str] = None,
+    product_column: Optional[str] = None,
+    demand_column: Optional[str] = None
+) -> Tuple[str, Optional[str], str]:
+    """Resolve the date, product and demand columns of a dataset.
+
+    Explicit names win; otherwise columns are matched by name. The product
+    column is optional - without one the dataset is a single series.
+    """
+    date_col = date_column or _find_column(df, DATE_HINTS)
+    product_col = product_column or _find_column(df, PRODUCT_HINTS)
+    demand_col = demand_column or _find_column(df, DEMAND_HINTS)
+
+    if demand_col is None:
+        numeric = [col for col in df.select_dtypes('number').columns if col != product_col]
+        demand_col = numeric[0] if numeric else None
+
+    if date_col is None or demand_col is None:
+        raise ValueError("Dataset needs a date column and a numeric demand column")
+
+    for col in (date_col, product_col, demand_col):
+        if col is not None and col not in df.columns:
+            raise ValueError(f"Column not found: {col}")
+
+    return date_col, product_col, demand_col
+
+def pivot_series(
+    df: pd.DataFrame,
+    date_col: str,
+    product_col: Optional[str],
+    demand_col: str
+) -> Tuple[np.ndarray, pd.DatetimeIndex, np.ndarray]:
+    """Lay out all series as one (n_series, n_periods) demand matrix.
+
+    Duplicate timestamps are summed. Periods before a series' first
+    observation are NaN; later periods with no row are treated as zero demand.
+    """
+    data = pd.DataFrame({
+        "date": pd.to_datetime(df[date_col]),
+        "key": df[product_col].astype(str) if product_col else "all",
+        "value": pd.to_numeric(df[demand_col], errors='coerce')
+    }).dropna(subset=["date"])
+
+    table = data.pivot_table(index="key", columns="date", values="value", aggfunc="sum")
+    values = table.to_numpy(dtype=float)
+
+    # Zero-fill gaps after each series has started
+    started = np.cumsum(~np.isnan(values), axis=1) > 0
+    values = np.where(started & np.isnan(values), 0.0, values)
+
+    return table.index.to_numpy(dtype=str), pd.DatetimeIndex(table.columns), values
@@ -0,0 +1,239 @@
+import hashlib
+import io
+import json
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Optional
+
+from ..database import SessionLocal
+from ..models.dataset import Dataset
+from .datasets import load_dataframe, detect_series_columns, derived_key, write_derived, read_derived
+from .storage import storage
+from .jobs import job_handler
+
+# Bump when the feature definitions change so cached tables are rebuilt
+FEATURE_SCHEMA_VERSION = 1
+
+DEFAULT_SPEC = {
+    "lags": [1, 7, 14, 28],
+    "windows": [7, 28],
+    "ewm_spans": [7, 28],
+    "price_lags": [1, 7]
+}
+
+# EWMA weights older than this are treated as zero when sizing the
+# recompute window for incremental updates
+EWM_TOLERANCE = 1e-6
+
+KEY_COLUMNS = ["key", "date", "demand", "price"]
+
+
+def _spec_hash(spec: dict) -> str:
+    payload = json.dumps({"schema": FEATURE_SCHEMA_VERSION, **spec}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _lookback(spec: dict) -> int:
+    """Periods of history a row's features depend on"""
+    ewm = [
+        int(np.ceil(np.log(EWM_TOLERANCE) / np.log(1 - 2 / (span + 1))))
+        for span in spec["ewm_spans"]
+    ]
+    return 1 + max(spec["lags"] + spec["windows"] + spec["price_lags"] + ewm + [0])
+
+
+def to_long_frame(df: pd.DataFrame, columns: Optional[dict] = None) -> pd.DataFrame:
+    """Normalise a dataset to key/date/demand/price rows sorted by series and date"""
+    columns = columns or {}
+    date_col, product_col, demand_col = detect_series_columns(
+        df,
+        columns.get("date_column"),
+        columns.get("product_column"),
+        columns.get("demand_column")
+    )
+    price_col = columns.get("price_column") or next(
+        (col for col in df.columns if 'price' in str(col).lower()), None
+    )
+
+    frame = pd.DataFrame({
+        "key": df[product_col].astype(str) if product_col else "all",
+        "date": pd.to_datetime(df[date_col], errors='coerce'),
+        "demand": pd.to_numeric(df[demand_col], errors='coerce'),
+        "price": pd.to_numeric(df[price_col], errors='coerce') if price_col else np.nan
+    }).dropna(subset=["date"])
+
+    return frame.sort_values(["key", "date"], kind="mergesort").reset_index(drop=True)
+
+
+def compute_features(frame: pd.DataFrame, spec: dict = DEFAULT_SPEC) -> pd.DataFrame:
+    """Lag, rolling, EWMA, calendar and price features for all series at once.
+
+    `frame` must be sorted by key and date. Everything is expressed as
+    grouped shift/rolling/ewm operations so no Python loop runs per series.
+    Demand-derived features only use values before the row's own date.
+    """
+    out = frame.copy()
+    grouped = out.groupby("key", sort=False)
+    past_demand = grouped["demand"].shift(1)
+    past_grouped = past_demand.groupby(out["key"], sort=False)
+
+    for lag in spec["lags"]:
+        out[f"demand_lag_{lag}"] = grouped["demand"].shift(lag)
+
+    for window in spec["windows"]:
+        rolling = past_grouped.rolling(window, min_periods=1)
+        out[f"demand_roll_mean_{window}"] = rolling.mean().reset_index(level=0, drop=True)
+        out[f"demand_roll_std_{window}"] = rolling.std().reset_index(level=0, drop=True)
+
+    for span in spec["ewm_spans"]:
+        out[f"demand_ewm_{span}"] = past_grouped.ewm(span=span, adjust=False).mean().reset_index(level=0, drop=True)
+
+    # Calendar
+    out["day_of_week"] = out["date"].dt.dayofweek
+    out["day_of_month"] = out["date"].dt.day
+    out["week_of_year"] = out["date"].dt.isocalendar().week.astype(int).to_numpy()
+    out["month"] = out["date"].dt.month
+    out["quarter"] = out["date"].dt.quarter
+    out["is_weekend"] = (out["day_of_week"] >= 5).astype(int)
+    out["is_month_end"] = out["date"].dt.is_month_end.astype(int)
+
+    # Price
+    for lag in spec["price_lags"]:
+        out[f"price_lag_{lag}"] = grouped["price"].shift(lag)
+    previous_price = grouped["price"].shift(1)
+    out["price_change_pct"] = (out["price"] - previous_price) / previous_price.replace(0, np.nan)
+    for window in spec["windows"]:
+        mean_price = out.groupby("key", sort=False)["price"].rolling(window, min_periods=1).mean().reset_index(level=0, drop=True)
+        out[f"price_rel_mean_{window}"] = out["price"] / mean_price.replace(0, np.nan)
+
+    return out
+
+
+def _row_hashes(frame: pd.DataFrame) -> pd.Series:
+    return pd.util.hash_pandas_object(frame[KEY_COLUMNS], index=False)
+
+
+def update_features(cached: pd.DataFrame, frame: pd.DataFrame, spec: dict = DEFAULT_SPEC) -> pd.DataFrame:
+    """Recompute only the rows whose feature windows contain new or changed data.
+
+    Rows are compared with the cached table position by position within
+    each series. From the first differing row on, features are rebuilt
+    using `lookback` earlier rows as context; rows before it are taken
+    from the cached table unchanged.
+    """
+    frame = frame.copy()
+    frame["_row_hash"] = _row_hashes(frame).to_numpy()
+    frame["_pos"] = frame.groupby("key", sort=False).cumcount()
+
+    cached_pos = cached.groupby("key", sort=False).cumcount()
+    known = pd.DataFrame({"key": cached["key"], "_pos": cached_pos, "_cached_hash": cached["_row_hash"]})
+    merged = frame.merge(known, on=["key", "_pos"], how="left")
+    changed = (merged["_row_hash"] != merged["_cached_hash"]).to_numpy()
+
+    first_changed = frame.loc[changed].groupby("key")["_pos"].min()
+    lengths = frame.groupby("key").size()
+    if first_changed.empty and cached.groupby("key").size().equals(lengths):
+        return cached
+
+    start = frame["key"].map(first_changed)
+    recompute = frame[start.notna() & (frame["_pos"] >= start - _lookback(spec))]
+
+    fresh = compute_features(recompute.drop(columns=["_row_hash", "_pos"]), spec)
+    fresh["_row_hash"] = recompute["_row_hash"].to_numpy()
+    fresh = fresh[(recompute["_pos"] >= start[recompute.index]).to_numpy()]
+
+    # Cached rows survive up to the first change, the new series length,
+    # or not at all if their series is gone
+    limit = cached["key"].map(first_changed.reindex(lengths.index).fillna(lengths))
+    kept = cached[(cached_pos < limit).to_numpy()]
+
+    combined = pd.concat([kept, fresh], ignore_index=True)
+    return combined.sort_values(["key", "date"], kind="mergesort").reset_index(drop=True)
+
+
+def read_manifest(dataset_id: str) -> Optional[dict]:
+    """Manifest of the current feature table, if one has been built"""
+    data = read_derived(derived_key(dataset_id, "features", "manifest.json"))
+    return json.loads(data) if data is not None else None
+
+
+def load_feature_table(dataset_id: str) -> Optional[pd.DataFrame]:
+    """Load the current feature table version from the cache"""
+    manifest = read_manifest(dataset_id)
+    if manifest is None:
+        return None
+    # Version files never change once written, so the local cache can serve them
+    return pd.read_pickle(storage.local_path(derived_key(dataset_id, "features", manifest["file"])))
+
+
+def materialize_features(
+    dataset_id: str,
+    df: pd.DataFrame,
+    spec: Optional[dict] = None,
+    columns: Optional[dict] = None
+) -> dict:
+    """Build or incrementally refresh the cached feature table of a dataset.
+
+    Each write produces a new version file and then swaps the manifest,
+    so readers never see a half-written table.
+    """
+    spec = {**DEFAULT_SPEC, **(spec or {})}
+    spec_hash = _spec_hash(spec)
+    frame = to_long_frame(df, columns)
+
+    manifest = read_manifest(dataset_id)
+    cached = load_feature_table(dataset_id) if manifest and manifest["spec_hash"] == spec_hash else None
+
+    if cached is not None:
+        table = update_features(cached, frame, spec)
+        if table is cached:
+            return manifest
+        mode = "incremental"
+    else:
+        table = compute_features(frame, spec)
+        table["_row_hash"] = _row_hashes(frame).to_numpy()
+        mode = "full"
+
+    version = (manifest["version"] + 1) if manifest else 1
+    filename = f"features_v{version}.pkl"
+    buffer = io.BytesIO()
+    table.to_pickle(buffer)
+    write_derived(derived_key(dataset_id, "features", filename), buffer.getvalue())
+
+    new_manifest = {
+        "dataset_id": dataset_id,
+        "version": version,
+        "file": filename,
+        "spec": spec,
+        "spec_hash": spec_hash,
+        "mode": mode,
+        "rows": len(table),
+        "series": int(table["key"].nunique()),
+        "columns": [col for col in table.columns if not col.startswith("_")],
+        "built_at": datetime.utcnow().isoformat()
+    }
+    write_derived(derived_key(dataset_id, "features", "manifest.json"), json.dumps(new_manifest).encode())
+
+    if manifest and manifest["file"] != filename:
+        storage.delete(derived_key(dataset_id, "features", manifest["file"]))
+
+    return new_manifest
+
+
+@job_handler("build_features")
+def build_features_job(ctx, payload: dict) -> dict:
+    """Background job: build or refresh the feature table of a dataset"""
+    db = SessionLocal()
+    try:
+        dataset = db.query(Dataset).filter(Dataset.id == payload["dataset_id"]).first()
+        if not dataset:
+            raise ValueError("Dataset not found")
+
+        ctx.progress(0.1, "Reading file")
+        df = load_dataframe(dataset)
+    finally:
+        db.close()
+
+    ctx.progress(0.3, "Computing features")
+    return materialize_features(payload["dataset_id"], df, payload.get("spec"), payload.get("columns"))
@@ -0,0 +1,203 @@
+import io
+import threading
+import warnings
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from ..database import SessionLocal
+from ..models.dataset import Dataset
+from ..models.forecast import ForecastArtifact
+from .backtest_models import smoothing_states
+from .jobs import job_handler
+from .quality import series_matrix
+from .storage import storage
+
+# Parameter arrays stored per artifact version, one .npy blob per column
+ARRAYS = ("keys", "level", "trend", "season")
+
+# Loaded artifact versions kept in memory per process
+_CACHE_SIZE = 16
+_cache: "OrderedDict[Tuple[str, int], LoadedArtifact]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def artifact_prefix(dataset_id: str, version: Optional[int] = None) -> str:
+    prefix = f"artifacts/{dataset_id}/forecast/"
+    return prefix if version is None else f"{prefix}v{version}/"
+
+
+def live_prefixes(dataset_id: str, version: int) -> Tuple[str, ...]:
+    """Prefixes kept for a dataset: the current version and the one before it"""
+    return tuple(artifact_prefix(dataset_id, v) for v in (version, version - 1) if v >= 1)
+
+
+def fit_parameters(
+    values: np.ndarray,
+    season_length: int = 7,
+    alpha: float = 0.3,
+    beta: float = 0.1
+) -> Dict[str, np.ndarray]:
+    """Fit level, trend and additive seasonal profile for every series at once.
+
+    The seasonal profile is the mean deviation from each season's mean over
+    the last (up to 8) full seasons, aligned so column 0 applies to the
+    first forecast period. Level and trend come from Holt smoothing of the
+    deseasonalised history.
+    """
+    n_series, n_periods = values.shape
+    season_length = season_length if n_periods >= 2 * season_length else 1
+
+    if season_length > 1:
+        seasons = min(n_periods // season_length, 8)
+        start = n_periods - seasons * season_length
+        block = values[:, start:].reshape(n_series, seasons, season_length)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            season = np.nanmean(block - np.nanmean(block, axis=2, keepdims=True), axis=1)
+        season = np.nan_to_num(season)
+        season -= season.mean(axis=1, keepdims=True)
+        phase = (np.arange(n_periods) - start) % season_length
+        deseasonalised = values - season[:, phase]
+    else:
+        season = np.zeros((n_series, 1))
+        deseasonalised = values
+
+    levels, trends = smoothing_states(deseasonalised, alpha=alpha, beta=beta)
+    return {
+        "level": np.nan_to_num(levels[:, -1]),
+        "trend": np.nan_to_num(trends[:, -1]),
+        "season": season
+    }
+
+
+def save_artifact(
+    db,
+    dataset_id: str,
+    keys: np.ndarray,
+    params: Dict[str, np.ndarray],
+    dates: pd.DatetimeIndex,
+    damping: float = 0.98
+) -> ForecastArtifact:
+    """Write a new parameter version to storage and make it current"""
+    artifact = db.query(ForecastArtifact).filter(ForecastArtifact.dataset_id == dataset_id).first()
+    version = artifact.version + 1 if artifact else 1
+    prefix = artifact_prefix(dataset_id, version)
+
+    columns = {"keys": np.asarray(keys, dtype=str), **params}
+    for name in ARRAYS:
+        buffer = io.BytesIO()
+        np.save(buffer, np.ascontiguousarray(columns[name]))
+        buffer.seek(0)
+        storage.save(f"{prefix}{name}.npy", buffer)
+
+    frequency = pd.infer_freq(dates) if len(dates) >= 3 else None
+    if frequency is None:
+        step = dates.to_series().diff().median() if len(dates) > 1 else pd.Timedelta(days=1)
+        frequency = pd.tseries.frequencies.to_offset(step).freqstr
+
+    if artifact is None:
+        artifact = ForecastArtifact(dataset_id=dataset_id)
+        db.add(artifact)
+    artifact.version = version
+    artifact.storage_prefix = prefix
+    artifact.series_count = len(keys)
+    artifact.season_length = params["season"].shape[1]
+    artifact.damping = damping
+    artifact.frequency = frequency
+    artifact.last_date = dates[-1].to_pydatetime()
+    artifact.fitted_at = datetime.utcnow()
+    db.commit()
+    db.refresh(artifact)
+
+    # Requests that read the row just before the swap may still be loading
+    # the previous version, so only versions older than that are removed
+    keep = live_prefixes(dataset_id, version)
+    for key, _ in list(storage.list_keys(artifact_prefix(dataset_id))):
+        if not key.startswith(keep):
+            storage.delete(key)
+
+    return artifact
+
+
+class LoadedArtifact:
+    """Memory-mapped parameter arrays of one artifact version"""
+
+    def __init__(self, artifact: ForecastArtifact):
+        arrays = {
+            name: np.load(storage.local_path(f"{artifact.storage_prefix}{name}.npy"), mmap_mode='r')
+            for name in ARRAYS
+        }
+        self.level = arrays["level"]
+        self.trend = arrays["trend"]
+        self.season = arrays["season"]
+        self.index = {key: i for i, key in enumerate(arrays["keys"].tolist())}
+        self.damping = artifact.damping
+        self.frequency = artifact.frequency
+        self.last_date = pd.Timestamp(artifact.last_date)
+
+    def predict(self, keys: List[str], horizon: int) -> Tuple[List[str], List[str], np.ndarray, pd.DatetimeIndex]:
+        """Forecast `horizon` periods for many series in one vectorized pass"""
+        found = [key for key in keys if key in self.index]
+        missing = [key for key in keys if key not in self.index]
+        rows = np.fromiter((self.index[key] for key in found), dtype=np.intp, count=len(found))
+
+        steps = np.arange(1, horizon + 1)
+        trend_multiplier = np.cumsum(self.damping ** steps)
+        season_columns = (steps - 1) % self.season.shape[1]
+
+        forecast = (
+            self.level[rows][:, None]
+            + self.trend[rows][:, None] * trend_multiplier[None, :]
+            + self.season[rows][:, season_columns]
+        )
+        dates = pd.date_range(self.last_date, periods=horizon + 1, freq=self.frequency)[1:]
+        return found, missing, np.clip(forecast, 0, None), dates
+
+
+def load_artifact(artifact: ForecastArtifact) -> LoadedArtifact:
+    """Loaded arrays for an artifact version, shared across requests"""
+    cache_key = (artifact.dataset_id, artifact.version)
+    with _cache_lock:
+        if cache_key in _cache:
+            _cache.move_to_end(cache_key)
+            return _cache[cache_key]
+
+    loaded = LoadedArtifact(artifact)
+    with _cache_lock:
+        _cache[cache_key] = loaded
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return loaded
+
+
+@job_handler("fit_forecast")
+def fit_forecast_job(ctx, payload: dict) -> dict:
+    """Background job: fit and persist forecast parameters of every series"""
+    db = SessionLocal()
+    try:
+        dataset = db.query(Dataset).filter(Dataset.id == payload["dataset_id"]).first()
+        if not dataset:
+            raise ValueError("Dataset not found")
+
+        ctx.progress(0.1, "Reading series")
+        keys, dates, values = series_matrix(dataset, payload)
+
+        ctx.progress(0.4, f"Fitting {len(keys)} series")
+        params = fit_parameters(values, season_length=payload.get("season_length", 7))
+
+        ctx.progress(0.8, "Saving parameters")
+        artifact = save_artifact(db, dataset.id, keys, params, dates, payload.get("damping", 0.98))
+
+        return {
+            "dataset_id": dataset.id,
+            "version": artifact.version,
+            "series_count": artifact.series_count,
+            "season_length": artifact.season_length,
+            "frequency": artifact.frequency,
+            "last_date": artifact.last_date.isoformat()
+        }
+    finally:
+        db.close()
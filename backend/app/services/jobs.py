@@ -0,0 +1,315 @@
+import json
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.job import Job
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+# kind -> handler(ctx, payload) returning a JSON-serialisable result
+_handlers: Dict[str, Callable[["JobContext", dict], Any]] = {}
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when the job has been cancelled"""
+
+
+class LeaseLost(Exception):
+    """Raised when another worker has taken over the job"""
+
+
+def job_handler(kind: str):
+    """Register a function as the handler for a job kind"""
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    payload: Optional[dict] = None,
+    created_by: Optional[str] = None,
+    project_id: Optional[str] = None,
+    dataset_id: Optional[str] = None,
+    max_attempts: Optional[int] = None
+) -> Job:
+    """Persist a new job; a worker picks it up on its next poll"""
+    if kind not in _handlers:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload or {}),
+        status="queued",
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_after=datetime.utcnow(),
+        created_by=created_by,
+        project_id=project_id,
+        dataset_id=dataset_id
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def request_cancel(db: Session, job: Job) -> Job:
+    """Cancel a queued job immediately or flag a running one"""
+    if job.status == "queued":
+        job.status = "cancelled"
+        job.finished_at = datetime.utcnow()
+    elif job.status == "running":
+        job.cancel_requested = True
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def job_result(job: Job) -> Any:
+    """Decode the JSON result stored on a job"""
+    return json.loads(job.result) if job.result else None
+
+
+class JobContext:
+    """Handle passed to job handlers for reporting progress"""
+
+    def __init__(self, pool: "JobWorkerPool", job_id: str, worker_id: str):
+        self.pool = pool
+        self.job_id = job_id
+        self.worker_id = worker_id
+
+    def progress(self, fraction: float, message: Optional[str] = None):
+        """Record progress, renew the lease and stop if cancelled"""
+        values = {
+            Job.progress: max(0.0, min(1.0, float(fraction))),
+            Job.heartbeat_at: datetime.utcnow(),
+            Job.lease_expires_at: datetime.utcnow() + timedelta(seconds=self.pool.lease_seconds)
+        }
+        if message is not None:
+            values[Job.message] = message
+        self.pool.touch(self.job_id, self.worker_id, values)
+
+    def check_cancelled(self):
+        """Raise JobCancelled if cancellation has been requested"""
+        self.pool.touch(self.job_id, self.worker_id, {Job.heartbeat_at: datetime.utcnow()})
+
+
+class JobWorkerPool:
+    """In-process worker threads that claim jobs from the database.
+
+    Jobs are claimed with a conditional UPDATE and held under a lease that
+    the pool renews while the handler runs. If the process dies the lease
+    expires and any other worker (or this one after a restart) reclaims it.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.JOB_WORKERS,
+        lease_seconds: int = settings.JOB_LEASE_SECONDS,
+        poll_interval: float = settings.JOB_POLL_INTERVAL
+    ):
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.node_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._threads = []
+        self._active: Dict[str, str] = {}  # job_id -> worker_id
+        self._lock = threading.Lock()
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker_loop,
+                args=(f"{self.node_id}:{index}",),
+                name=f"job-worker-{index}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def touch(self, job_id: str, worker_id: str, values: dict):
+        """Update a job we hold the lease for"""
+        db = SessionLocal()
+        try:
+            updated = db.query(Job).filter(
+                Job.id == job_id,
+                Job.lease_owner == worker_id,
+                Job.status == "running"
+            ).update(values, synchronize_session=False)
+            db.commit()
+            if not updated:
+                raise LeaseLost(job_id)
+
+            cancel_requested = db.query(Job.cancel_requested).filter(Job.id == job_id).scalar()
+            if cancel_requested:
+                raise JobCancelled(job_id)
+        finally:
+            db.close()
+
+    def _claimable(self, now: datetime):
+        return or_(
+            and_(Job.status == "queued", Job.run_after <= now),
+            and_(Job.status == "running", Job.lease_expires_at < now)
+        )
+
+    def _claim(self, db: Session, worker_id: str) -> Optional[Job]:
+        now = datetime.utcnow()
+        candidates = db.query(Job.id).filter(
+            self._claimable(now),
+            Job.kind.in_(list(_handlers.keys()))
+        ).order_by(Job.created_at).limit(5).all()
+
+        for (job_id,) in candidates:
+            claimed = db.query(Job).filter(
+                Job.id == job_id,
+                self._claimable(now)
+            ).update({
+                Job.status: "running",
+                Job.lease_owner: worker_id,
+                Job.lease_expires_at: now + timedelta(seconds=self.lease_seconds),
+                Job.heartbeat_at: now,
+                Job.attempts: Job.attempts + 1,
+                Job.started_at: now
+            }, synchronize_session=False)
+            db.commit()
+            if claimed:
+                return db.query(Job).filter(Job.id == job_id).first()
+
+        return None
+
+    def _finish(self, job_id: str, worker_id: str, values: dict):
+        db = SessionLocal()
+        try:
+            values.update({
+                Job.lease_owner: None,
+                Job.lease_expires_at: None
+            })
+            db.query(Job).filter(
+                Job.id == job_id,
+                Job.lease_owner == worker_id
+            ).update(values, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _run(self, job: Job, worker_id: str):
+        job_id = job.id
+        now = datetime.utcnow()
+
+        if job.attempts > job.max_attempts:
+            # Reclaimed after its last attempt crashed the process
+            self._finish(job_id, worker_id, {
+                Job.status: "failed",
+                Job.error: job.error or "Worker lease expired",
+                Job.finished_at: now
+            })
+            return
+
+        if job.cancel_requested:
+            self._finish(job_id, worker_id, {Job.status: "cancelled", Job.finished_at: now})
+            return
+
+        handler = _handlers[job.kind]
+        payload = json.loads(job.payload) if job.payload else {}
+        ctx = JobContext(self, job_id, worker_id)
+
+        with self._lock:
+            self._active[job_id] = worker_id
+        try:
+            result = handler(ctx, payload)
+            self._finish(job_id, worker_id, {
+                Job.status: "succeeded",
+                Job.progress: 1.0,
+                Job.result: json.dumps(result, default=str) if result is not None else None,
+                Job.error: None,
+                Job.finished_at: datetime.utcnow()
+            })
+        except JobCancelled:
+            self._finish(job_id, worker_id, {
+                Job.status: "cancelled",
+                Job.finished_at: datetime.utcnow()
+            })
+        except LeaseLost:
+            logger.warning("Lost lease on job %s", job_id)
+        except Exception as e:
+            logger.exception("Job %s failed", job_id)
+            if job.attempts < job.max_attempts:
+                backoff = settings.JOB_RETRY_BACKOFF_SECONDS * (2 ** (job.attempts - 1))
+                self._finish(job_id, worker_id, {
+                    Job.status: "queued",
+                    Job.error: str(e),
+                    Job.run_after: datetime.utcnow() + timedelta(seconds=backoff)
+                })
+            else:
+                self._finish(job_id, worker_id, {
+                    Job.status: "failed",
+                    Job.error: str(e),
+                    Job.finished_at: datetime.utcnow()
+                })
+        finally:
+            with self._lock:
+                self._active.pop(job_id, None)
+
+    def _worker_loop(self, worker_id: str):
+        while not self._stop.is_set():
+            job = None
+            db = SessionLocal()
+            try:
+                job = self._claim(db, worker_id)
+                if job is not None:
+                    db.expunge(job)
+            except Exception:
+                logger.exception("Error claiming job")
+            finally:
+                db.close()
+
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+
+            self._run(job, worker_id)
+
+    def _heartbeat_loop(self):
+        interval = max(self.lease_seconds / 3, 0.1)
+        while not self._stop.wait(interval):
+            with self._lock:
+                active = list(self._active.items())
+
+            for job_id, worker_id in active:
+                try:
+                    self.touch(job_id, worker_id, {
+                        Job.heartbeat_at: datetime.utcnow(),
+                        Job.lease_expires_at: datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+                    })
+                except (JobCancelled, LeaseLost):
+                    # The handler notices on its next progress() call
+                    pass
+                except Exception:
+                    logger.exception("Error renewing lease for job %s", job_id)
+
+
+worker_pool = JobWorkerPool()
@@ -0,0 +1,335 @@
+import io
+import json
+import warnings
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Optional, Tuple
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.dataset import Dataset
+from .datasets import load_dataframe, detect_series_columns, pivot_series, derived_key, write_derived, read_derived
+from .jobs import job_handler
+
+GAP_FILL_METHODS = ("zero", "ffill", "interpolate", "none")
+DUPLICATE_POLICIES = ("sum", "mean", "last")
+
+REPORT_COUNTS = (
+    "rows", "duplicates", "gaps", "invalid_dates", "invalid_values",
+    "negative_values", "outliers", "misaligned"
+)
+
+
+def infer_frequency(keys: np.ndarray, dates: pd.Series) -> str:
+    """Most common spacing between consecutive observations within a series"""
+    order = np.lexsort((dates.to_numpy(), keys))
+    sorted_dates = dates.to_numpy()[order]
+    same_series = keys[order][1:] == keys[order][:-1]
+    steps = pd.Series(np.diff(sorted_dates)[same_series])
+    steps = steps[steps > pd.Timedelta(0)]
+    if steps.empty:
+        return "D"
+
+    step = steps.mode().iloc[0]
+    # Calendar months, quarters and years are not fixed-length; periods
+    # are labelled by their first day whatever day the data falls on
+    if pd.Timedelta(days=28) <= step <= pd.Timedelta(days=31):
+        return "MS"
+    if pd.Timedelta(days=89) <= step <= pd.Timedelta(days=92):
+        return "QS"
+    if pd.Timedelta(days=365) <= step <= pd.Timedelta(days=366):
+        return "YS"
+    return pd.tseries.frequencies.to_offset(step).freqstr
+
+
+def _is_end_anchored(offset) -> bool:
+    """Offsets whose dates label the end of their period (month end, W-SUN, ...)"""
+    if isinstance(offset, pd.offsets.Week):
+        return offset.weekday is not None
+    return type(offset).__name__.endswith("End")
+
+
+def period_grid(dates: pd.Series, frequency: str, max_periods: int) -> Tuple[pd.DatetimeIndex, np.ndarray]:
+    """Regular grid covering `dates` and the grid position of each date.
+
+    A date belongs to the period it falls in: the last grid point on or
+    before it, or for end-anchored offsets the first one on or after it.
+    """
+    offset = pd.tseries.frequencies.to_offset(frequency)
+    first, last = dates.min(), dates.max()
+    if not isinstance(offset, pd.offsets.Tick):
+        # Calendar offsets compare days; the time of day is not part of the period
+        dates, first, last = dates.dt.normalize(), first.normalize(), last.normalize()
+
+    end_anchored = _is_end_anchored(offset)
+    start = offset.rollforward(first) if end_anchored else offset.rollback(first)
+    step = (start + offset) - start
+    if step <= pd.Timedelta(0) or (last - start) / step + 1 > max_periods:
+        raise ValueError(
+            f"Frequency '{frequency}' gives more than {max_periods} periods between "
+            f"{first.date()} and {last.date()}; check for mistyped dates or use a coarser frequency"
+        )
+
+    grid = pd.date_range(start, offset.rollforward(last) if end_anchored else last, freq=offset)
+    if end_anchored:
+        position = grid.searchsorted(dates, side='left')
+    else:
+        position = grid.searchsorted(dates, side='right') - 1
+    return grid, np.clip(position, 0, len(grid) - 1)
+
+
+def _series_median(values: np.ndarray, codes: np.ndarray, n_series: int) -> np.ndarray:
+    """NaN-ignoring median of `values` per series code"""
+    median = pd.Series(values).groupby(codes).median()
+    return median.reindex(np.arange(n_series)).to_numpy(dtype=float)
+
+
+def assess_quality(
+    df: pd.DataFrame,
+    columns: Optional[dict] = None,
+    frequency: Optional[str] = None,
+    gap_fill: str = settings.QUALITY_GAP_FILL,
+    duplicate_policy: str = settings.QUALITY_DUPLICATE_POLICY,
+    outlier_threshold: float = settings.QUALITY_OUTLIER_THRESHOLD
+) -> Tuple[pd.DataFrame, dict]:
+    """Check every series at once and build the canonical regular series table.
+
+    All series share one period grid and are laid out back to back over
+    their own spans, so duplicates, gaps and outliers are found with array
+    operations rather than per product. Negative and non-numeric demand is reported and treated as
+    missing; gaps are then filled with `gap_fill`. Outliers (robust z-score
+    against the series median/MAD) are flagged, not changed.
+    """
+    if gap_fill not in GAP_FILL_METHODS:
+        raise ValueError(f"gap_fill must be one of: {', '.join(GAP_FILL_METHODS)}")
+    if duplicate_policy not in DUPLICATE_POLICIES:
+        raise ValueError(f"duplicate_policy must be one of: {', '.join(DUPLICATE_POLICIES)}")
+
+    columns = columns or {}
+    date_col, product_col, demand_col = detect_series_columns(
+        df,
+        columns.get("date_column"),
+        columns.get("product_column"),
+        columns.get("demand_column")
+    )
+
+    keys_all = df[product_col].astype(str).to_numpy() if product_col else np.full(len(df), "all")
+    dates_all = pd.to_datetime(df[date_col], errors='coerce')
+    values_all = pd.to_numeric(df[demand_col], errors='coerce').to_numpy(dtype=float)
+
+    series_keys, key_codes_all = np.unique(keys_all, return_inverse=True)
+    n_series = len(series_keys)
+    counts = {name: np.zeros(n_series, dtype=int) for name in REPORT_COUNTS}
+    counts["rows"] = np.bincount(key_codes_all, minlength=n_series)
+
+    valid_date = dates_all.notna().to_numpy()
+    counts["invalid_dates"] = np.bincount(key_codes_all[~valid_date], minlength=n_series)
+    key_codes = key_codes_all[valid_date]
+    dates = dates_all[valid_date].reset_index(drop=True)
+    values = values_all[valid_date]
+
+    counts["invalid_values"] = np.bincount(key_codes[np.isnan(values)], minlength=n_series)
+    negative = values < 0
+    counts["negative_values"] = np.bincount(key_codes[negative], minlength=n_series)
+    values = np.where(negative, np.nan, values)
+
+    if len(dates) == 0:
+        raise ValueError("Dataset has no valid dates")
+
+    # One regular grid for all series; each date snaps to the period it
+    # falls in
+    frequency = frequency or infer_frequency(key_codes, dates)
+    grid, position = period_grid(dates, frequency, settings.QUALITY_MAX_CELLS)
+    n_periods = len(grid)
+
+    # Rows are misaligned when they sit elsewhere in their period than is
+    # usual for their series (e.g. one Tuesday in a series of Mondays)
+    pairs = pd.DataFrame({"series": key_codes, "within": dates.to_numpy() - grid[position].to_numpy()})
+    usual = pairs.value_counts().reset_index().drop_duplicates("series").set_index("series")["within"]
+    misaligned = pairs["within"].to_numpy() != usual.reindex(key_codes).to_numpy()
+    counts["misaligned"] = np.bincount(key_codes[misaligned], minlength=n_series)
+
+    # Cells only cover each series' own span, from its first to its last
+    # row, laid out series after series
+    has_rows = np.bincount(key_codes, minlength=n_series) > 0
+    starts = np.full(n_series, n_periods)
+    ends = np.full(n_series, -1)
+    np.minimum.at(starts, key_codes, position)
+    np.maximum.at(ends, key_codes, position)
+    starts = np.where(has_rows, starts, 0)
+    spans = np.where(has_rows, ends - starts + 1, 0)
+    n_cells = int(spans.sum())
+    if n_cells > settings.QUALITY_MAX_CELLS:
+        raise ValueError(
+            f"Series span {n_cells} periods in total at frequency '{frequency}' "
+            f"(limit {settings.QUALITY_MAX_CELLS}); use a coarser frequency"
+        )
+
+    first_cell = np.concatenate(([0], np.cumsum(spans)[:-1]))
+    cell_series = np.repeat(np.arange(n_series), spans)
+    cell_period = np.arange(n_cells) - first_cell[cell_series] + starts[cell_series]
+
+    cell = first_cell[key_codes] + position - starts[key_codes]
+    rows_per_cell = np.bincount(cell, minlength=n_cells)
+    observed = ~np.isnan(values)
+    valid_per_cell = np.bincount(cell[observed], minlength=n_cells)
+    counts["duplicates"] = np.bincount(cell_series, weights=np.clip(rows_per_cell - 1, 0, None), minlength=n_series).astype(int)
+
+    if duplicate_policy == "last":
+        # Later rows in the file win
+        matrix = np.full(n_cells, np.nan)
+        matrix[cell[observed]] = values[observed]
+    else:
+        sums = np.bincount(cell[observed], weights=values[observed], minlength=n_cells)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            matrix = sums / valid_per_cell if duplicate_policy == "mean" else sums
+        matrix = np.where(valid_per_cell > 0, matrix, np.nan)
+
+    missing = np.isnan(matrix)
+    counts["gaps"] = np.bincount(cell_series[rows_per_cell == 0], minlength=n_series)
+
+    median = _series_median(matrix, cell_series, n_series)[cell_series]
+    deviation = np.abs(matrix - median)
+    mad = 1.4826 * _series_median(deviation, cell_series, n_series)[cell_series]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        score = deviation / np.where(mad > 0, mad, np.nan)
+    outlier = np.nan_to_num(score) > outlier_threshold
+    counts["outliers"] = np.bincount(cell_series[outlier], minlength=n_series)
+
+    if gap_fill == "zero":
+        filled = np.where(missing, 0.0, matrix)
+    elif gap_fill in ("ffill", "interpolate"):
+        # Nearest observed cell before (and after) each cell, within its series
+        index = np.arange(n_cells)
+        previous = np.maximum.accumulate(np.where(missing, -1, index))
+        previous = np.where(previous >= first_cell[cell_series], previous, -1)
+        before = np.where(previous >= 0, matrix[np.maximum(previous, 0)], np.nan)
+        if gap_fill == "ffill":
+            filled = before
+        else:
+            following = np.minimum.accumulate(np.where(missing, n_cells, index)[::-1])[::-1]
+            following = np.where(following < first_cell[cell_series] + spans[cell_series], following, -1)
+            after = np.where(following >= 0, matrix[np.minimum(following, n_cells - 1)], np.nan)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                share = (index - previous) / (following - previous)
+            inside = missing & (previous >= 0) & (following >= 0)
+            filled = np.where(inside, before + (after - before) * share, matrix)
+    else:
+        filled = matrix
+
+    table = pd.DataFrame({
+        "key": series_keys[cell_series],
+        "date": grid[cell_period],
+        "demand": filled,
+        "filled": missing,
+        "outlier": outlier
+    })
+
+    first_dates = grid[np.clip(starts, 0, n_periods - 1)]
+    last_dates = grid[np.clip(ends, 0, n_periods - 1)]
+    products = [
+        {
+            "key": str(series_keys[i]),
+            "first_date": first_dates[i].isoformat() if ends[i] >= 0 else None,
+            "last_date": last_dates[i].isoformat() if ends[i] >= 0 else None,
+            **{name: int(counts[name][i]) for name in REPORT_COUNTS}
+        }
+        for i in range(n_series)
+    ]
+
+    report = {
+        "frequency": frequency,
+        "columns": {"date": date_col, "product": product_col, "demand": demand_col},
+        "settings": {
+            "gap_fill": gap_fill,
+            "duplicate_policy": duplicate_policy,
+            "outlier_threshold": outlier_threshold
+        },
+        "series": n_series,
+        "periods": n_periods,
+        "totals": {name: int(counts[name].sum()) for name in REPORT_COUNTS},
+        "products": products
+    }
+    return table, report
+
+
+def canonical_matrix(table: pd.DataFrame) -> Tuple[np.ndarray, pd.DatetimeIndex, np.ndarray]:
+    """Canonical table as the (keys, dates, values) layout of `pivot_series`.
+
+    Periods after a series' last row (and gaps left unfilled) are zero
+    demand, matching the raw-file path.
+    """
+    pivot = table.pivot(index="key", columns="date", values="demand")
+    values = pivot.to_numpy(dtype=float)
+    started = np.cumsum(~np.isnan(values), axis=1) > 0
+    values = np.where(started & np.isnan(values), 0.0, values)
+    return pivot.index.to_numpy(dtype=str), pd.DatetimeIndex(pivot.columns), values
+
+
+def save_quality(dataset_id: str, table: pd.DataFrame, report: dict):
+    """Persist the canonical table and report, replacing any previous run"""
+    buffer = io.BytesIO()
+    table.to_pickle(buffer)
+    write_derived(derived_key(dataset_id, "quality", "series.pkl"), buffer.getvalue())
+    write_derived(derived_key(dataset_id, "quality", "report.json"), json.dumps(report).encode())
+
+
+def read_quality_report(dataset_id: str) -> Optional[dict]:
+    data = read_derived(derived_key(dataset_id, "quality", "report.json"))
+    return json.loads(data) if data is not None else None
+
+
+def load_canonical_series(dataset_id: str) -> Optional[pd.DataFrame]:
+    """Cleaned regular series table of a dataset, if the quality stage has run"""
+    data = read_derived(derived_key(dataset_id, "quality", "series.pkl"))
+    return pd.read_pickle(io.BytesIO(data)) if data is not None else None
+
+
+def series_matrix(dataset: Dataset, payload: dict) -> Tuple[np.ndarray, pd.DatetimeIndex, np.ndarray]:
+    """Demand matrix for a job: the canonical series when the quality stage
+    has run and no columns were chosen explicitly, otherwise the raw file"""
+    overrides = [payload.get(name) for name in ("date_column", "product_column", "demand_column")]
+    table = None if any(overrides) else load_canonical_series(dataset.id)
+    if table is not None:
+        return canonical_matrix(table)
+
+    df = load_dataframe(dataset)
+    return pivot_series(df, *detect_series_columns(df, *overrides))
+
+
+@job_handler("quality_check")
+def quality_check_job(ctx, payload: dict) -> dict:
+    """Background job: data-quality pass and canonical series table"""
+    db = SessionLocal()
+    try:
+        dataset = db.query(Dataset).filter(Dataset.id == payload["dataset_id"]).first()
+        if not dataset:
+            raise ValueError("Dataset not found")
+
+        ctx.progress(0.1, "Reading file")
+        df = load_dataframe(dataset)
+    finally:
+        db.close()
+
+    ctx.progress(0.4, "Checking series")
+    table, report = assess_quality(
+        df,
+        columns=payload.get("columns"),
+        frequency=payload.get("frequency"),
+        gap_fill=payload.get("gap_fill") or settings.QUALITY_GAP_FILL,
+        duplicate_policy=payload.get("duplicate_policy") or settings.QUALITY_DUPLICATE_POLICY,
+        outlier_threshold=payload.get("outlier_threshold") or settings.QUALITY_OUTLIER_THRESHOLD
+    )
+    report["dataset_id"] = payload["dataset_id"]
+    report["checked_at"] = datetime.utcnow().isoformat()
+
+    ctx.progress(0.8, "Saving canonical series")
+    save_quality(payload["dataset_id"], table, report)
+
+    return {
+        "dataset_id": payload["dataset_id"],
+        "frequency": report["frequency"],
+        "series": report["series"],
+        "totals": report["totals"]
+    }
@@ -0,0 +1,317 @@
+import io
+import json
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Optional, Tuple
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.dataset import Dataset
+from .datasets import load_dataframe, detect_series_columns, derived_key, write_derived, read_derived
+from .jobs import job_handler
+
+# Normal quantile of the reported confidence intervals
+CONFIDENCE = 0.95
+Z_SCORE = 1.959964
+
+# Nested sub-sample sizes tried within a time budget; each is ~4x the last
+SAMPLE_LEVELS = (1 / 64, 1 / 16, 1 / 4, 1.0)
+
+# Bump when the stored sample layout changes so older samples are rebuilt
+SAMPLE_FORMAT_VERSION = 2
+
+# Bookkeeping columns stored with the sampled rows
+STRATUM = "_stratum"
+RANK = "_rank"
+POPULATION = "_population"
+SIZE = "_size"
+INTERNAL_COLUMNS = (STRATUM, RANK, POPULATION, SIZE)
+
+
+def build_sample(
+    df: pd.DataFrame,
+    stratum_column: Optional[str] = None,
+    fraction: float = settings.SAMPLE_FRACTION,
+    min_per_stratum: int = settings.SAMPLE_MIN_PER_STRATUM,
+    max_rows: int = settings.SAMPLE_MAX_ROWS,
+    seed: int = 0
+) -> Tuple[pd.DataFrame, dict]:
+    """Stratified random sample with one stratum per product.
+
+    Each stratum keeps `fraction` of its rows (scaled down so the sample
+    stays near `max_rows`), but at least `min_per_stratum` so small products
+    are still represented. Rows carry their stratum, population and sample
+    size, plus a random rank: the rows of a stratum with rank < k are
+    themselves a simple random sample, which lets readers trade accuracy
+    for time by using a prefix.
+    """
+    n_rows = len(df)
+    strata = df[stratum_column].astype(str).to_numpy() if stratum_column else np.full(n_rows, "all")
+    stratum_keys, codes = np.unique(strata, return_inverse=True)
+    population = np.bincount(codes, minlength=len(stratum_keys))
+
+    fraction = min(fraction, max_rows / max(n_rows, 1))
+    size = np.minimum(population, np.maximum(np.ceil(fraction * population), min_per_stratum)).astype(int)
+
+    # Random order within each stratum: sort by (stratum, random key)
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(n_rows), codes))
+    starts = np.concatenate(([0], np.cumsum(population)[:-1]))
+    rank = np.empty(n_rows, dtype=int)
+    rank[order] = np.arange(n_rows) - starts[codes[order]]
+
+    # Exact non-missing counts per stratum: they weight the strata, and
+    # estimating them from the sample as well leaves the intervals too narrow
+    nonmissing = {
+        str(col): dict(zip(
+            stratum_keys.tolist(),
+            np.bincount(codes[df[col].notna().to_numpy()], minlength=len(stratum_keys)).tolist()
+        ))
+        for col in df.columns
+        if df[col].dtype in ['int64', 'float64']
+    }
+
+    keep = rank < size[codes]
+    sample = df[keep].copy()
+    sample[STRATUM] = stratum_keys[codes[keep]]
+    sample[RANK] = rank[keep]
+    sample[POPULATION] = population[codes[keep]]
+    sample[SIZE] = size[codes[keep]]
+
+    meta = {
+        "format": SAMPLE_FORMAT_VERSION,
+        "stratum_column": stratum_column,
+        "strata": len(stratum_keys),
+        "total_rows": n_rows,
+        "sample_rows": int(keep.sum()),
+        "sampling_fraction": float(keep.sum() / max(n_rows, 1)),
+        "nonmissing": nonmissing
+    }
+    return sample.reset_index(drop=True), meta
+
+
+def _stratified_mean(values: np.ndarray, codes: np.ndarray, nonmissing: np.ndarray):
+    """Stratified estimate of the mean, its variance and of E[x^2].
+
+    Strata are weighted by their true non-missing counts. Strata with a
+    single sampled value borrow the pooled within-stratum variance. The
+    variance is None when the sample covers every non-missing value.
+    """
+    observed = ~np.isnan(values)
+    n_strata = len(nonmissing)
+    count = np.bincount(codes[observed], minlength=n_strata)
+    total = np.bincount(codes[observed], weights=values[observed], minlength=n_strata)
+    total_sq = np.bincount(codes[observed], weights=values[observed] ** 2, minlength=n_strata)
+
+    has = count > 0
+    mean_h = np.divide(total, count, out=np.zeros(n_strata), where=has)
+    mean_sq_h = np.divide(total_sq, count, out=np.zeros(n_strata), where=has)
+    var_h = np.divide(
+        total_sq - count * mean_h ** 2, count - 1,
+        out=np.zeros(n_strata), where=count > 1
+    ).clip(min=0)
+
+    pooled_df = np.clip(count - 1, 0, None).sum()
+    if pooled_df > 0:
+        pooled = float((np.clip(count - 1, 0, None) * var_h).sum() / pooled_df)
+    else:
+        pooled = float(np.var(values[observed], ddof=1)) if observed.sum() > 1 else 0.0
+    var_h = np.where(count == 1, pooled, var_h)
+
+    # Strata whose values were all missing in the sample drop out
+    represented = np.where(has, nonmissing, 0).astype(float)
+    weight = represented / represented.sum() if represented.sum() > 0 else represented
+    finite_correction = 1 - np.divide(count, nonmissing, out=np.ones(n_strata), where=nonmissing > 0)
+
+    mean = float((weight * mean_h).sum())
+    mean_sq = float((weight * mean_sq_h).sum())
+    if (count >= nonmissing).all():
+        return mean, None, mean_sq
+    variance = float((weight ** 2 * finite_correction * np.divide(var_h, count, out=np.zeros(n_strata), where=has)).sum())
+    return mean, variance, mean_sq
+
+
+def _interval(estimate: float, variance: float) -> list:
+    half_width = Z_SCORE * np.sqrt(max(variance, 0.0))
+    return [float(estimate - half_width), float(estimate + half_width)]
+
+
+def _estimate(sample: pd.DataFrame, meta: dict, level: float, date_column: Optional[str]) -> dict:
+    """Statistics and chart rows from the nested sub-sample at `level`"""
+    # At least two rows per stratum, so every stratum has a variance
+    full_size = sample[SIZE].to_numpy()
+    size = np.minimum(full_size, np.maximum(np.ceil(full_size * level), 2)).astype(int)
+    keep = sample[RANK].to_numpy() < size
+    sub = sample[keep]
+
+    stratum_keys, all_codes = np.unique(sample[STRATUM].to_numpy(dtype=str), return_inverse=True)
+    n_strata = len(stratum_keys)
+    codes = all_codes[keep]
+    population = np.zeros(n_strata)
+    population[codes] = sub[POPULATION].to_numpy()
+    stratum_size = np.zeros(n_strata)
+    stratum_size[codes] = size[keep]
+    row_weight = population[codes] / stratum_size[codes]
+
+    # Sample rows in rank order within each stratum
+    order = np.lexsort((sample[RANK].to_numpy(), all_codes))
+    first = np.searchsorted(all_codes[order], np.arange(n_strata))
+
+    data = sub.drop(columns=list(INTERNAL_COLUMNS))
+    stats = {}
+    warnings = []
+    for col in data.columns:
+        if data[col].dtype in ['int64', 'float64']:
+            # The first non-missing values in rank order are a simple random
+            # sample of the stratum's non-missing values, so each stratum
+            # contributes at least two of them when the sample has them
+            all_values = sample[col].to_numpy(dtype=float)
+            observed_sorted = ~np.isnan(all_values[order])
+            seen = np.cumsum(observed_sorted)
+            observed_rank = np.empty(len(sample), dtype=int)
+            observed_rank[order] = seen - np.concatenate(([0], seen))[first][all_codes[order]] - 1
+            use = keep | (~np.isnan(all_values) & (observed_rank < 2))
+            values = all_values[use]
+
+            counts = meta["nonmissing"].get(str(col), {})
+            nonmissing = np.array([counts.get(key, 0) for key in stratum_keys], dtype=float)
+            mean, variance, mean_sq = _stratified_mean(values, all_codes[use], nonmissing)
+
+            if variance is None:
+                mean_ci = _interval(mean, 0.0)
+            elif variance > 0:
+                mean_ci = _interval(mean, variance)
+            else:
+                # Identical sampled values say nothing about the spread
+                mean_ci = None
+                warnings.append(f"No confidence interval for the mean of '{col}': all sampled values are equal")
+
+            count = int(nonmissing.sum())
+            stats[col] = {
+                # min/max are of the sample, so they bound the true values from inside
+                "min": float(np.nanmin(values)) if not np.isnan(values).all() else None,
+                "max": float(np.nanmax(values)) if not np.isnan(values).all() else None,
+                "mean": mean,
+                "std": float(np.sqrt(max(mean_sq - mean ** 2, 0.0))),
+                # Counted exactly at ingest
+                "count": count,
+                "ci": {
+                    "mean": mean_ci,
+                    "count": [count, count]
+                }
+            }
+        else:
+            # Estimated counts of the most common values; unique_count is a lower bound
+            weighted = pd.Series(row_weight, index=data.index).groupby(data[col]).sum()
+            stats[col] = {
+                "unique_count": int(data[col].nunique()),
+                "most_common": weighted.nlargest(5).round().astype(int).to_dict()
+            }
+
+    time_series_data = None
+    if date_column is not None:
+        try:
+            chart = data.assign(**{date_column: pd.to_datetime(data[date_column])})
+            time_series_data = chart.sort_values(date_column).to_dict('records')
+        except (ValueError, TypeError) as e:
+            warnings.append(f"Could not parse date column '{date_column}': {e}")
+            time_series_data = data.to_dict('records')
+
+    return {
+        "columns": data.columns.tolist(),
+        "statistics": stats,
+        "time_series_data": time_series_data,
+        "warnings": warnings,
+        "sample_rows": len(sub)
+    }
+
+
+def approximate_analysis(sample: pd.DataFrame, meta: dict, budget_ms: int) -> dict:
+    """Sample-based analysis that fits in roughly `budget_ms`.
+
+    Nested sub-samples are evaluated from smallest to largest, stopping
+    when the next (about 4x larger) one would overrun the budget; the
+    smallest is always returned even if it takes longer.
+    """
+    date_columns = [
+        col for col in sample.columns
+        if col not in INTERNAL_COLUMNS and ('date' in str(col).lower() or 'time' in str(col).lower())
+    ]
+    date_column = date_columns[0] if date_columns else None
+
+    started = time.perf_counter()
+    budget = budget_ms / 1000
+    result = None
+    for level in SAMPLE_LEVELS:
+        level_started = time.perf_counter()
+        result = _estimate(sample, meta, level, date_column)
+        took = time.perf_counter() - level_started
+        if time.perf_counter() - started + 4 * took > budget:
+            break
+
+    return {
+        **result,
+        "mode": "approx",
+        "exact": False,
+        "confidence": CONFIDENCE,
+        "sampling_fraction": result["sample_rows"] / max(meta["total_rows"], 1),
+        "stratum_column": meta["stratum_column"],
+        "strata": meta["strata"],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "total_rows": meta["total_rows"],
+        "total_columns": len(result["columns"])
+    }
+
+
+def save_sample(dataset_id: str, sample: pd.DataFrame, meta: dict):
+    """Persist the sample and its metadata, replacing any previous one"""
+    buffer = io.BytesIO()
+    sample.to_pickle(buffer)
+    write_derived(derived_key(dataset_id, "sample", "rows.pkl"), buffer.getvalue())
+    write_derived(derived_key(dataset_id, "sample", "meta.json"), json.dumps(meta).encode())
+
+
+def load_sample(dataset_id: str) -> Optional[Tuple[pd.DataFrame, dict]]:
+    """Stored sample of a dataset, if one has been built in the current format"""
+    meta = read_derived(derived_key(dataset_id, "sample", "meta.json"))
+    if meta is None:
+        return None
+    meta = json.loads(meta)
+    if meta.get("format") != SAMPLE_FORMAT_VERSION:
+        return None
+    rows = read_derived(derived_key(dataset_id, "sample", "rows.pkl"))
+    return pd.read_pickle(io.BytesIO(rows)), meta
+
+
+@job_handler("build_sample")
+def build_sample_job(ctx, payload: dict) -> dict:
+    """Background job: stratified sample for approximate analysis"""
+    db = SessionLocal()
+    try:
+        dataset = db.query(Dataset).filter(Dataset.id == payload["dataset_id"]).first()
+        if not dataset:
+            raise ValueError("Dataset not found")
+
+        ctx.progress(0.1, "Reading file")
+        df = load_dataframe(dataset)
+    finally:
+        db.close()
+
+    # One stratum per product; datasets without one are sampled as a whole
+    try:
+        _, stratum_column, _ = detect_series_columns(df)
+    except ValueError:
+        stratum_column = None
+
+    ctx.progress(0.5, "Sampling")
+    sample, meta = build_sample(df, stratum_column)
+    meta["dataset_id"] = payload["dataset_id"]
+    meta["built_at"] = datetime.utcnow().isoformat()
+
+    ctx.progress(0.8, "Saving sample")
+    save_sample(payload["dataset_id"], sample, meta)
+
+    # Per-stratum counts can be large; they stay with the stored sample
+    return {key: value for key, value in meta.items() if key != "nonmissing"}
@@ -0,0 +1,260 @@
+import os
+import shutil
+import tempfile
+import threading
+from typing import AsyncIterator, BinaryIO, Callable, Iterator, Optional, Tuple
+
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from ..config import settings
+
+CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+class StorageBackend:
+    """Blob store for dataset files.
+
+    Files are addressed by relative keys such as "<project_id>/<file>.csv".
+    Backends implement the blocking primitives; the async helpers run them
+    in the threadpool so request handlers never block the event loop.
+    """
+
+    def save(self, key: str, fileobj: BinaryIO) -> int:
+        raise NotImplementedError
+
+    def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def list_keys(self, prefix: str = "") -> Iterator[Tuple[str, float]]:
+        """Yield (key, last modified timestamp) for every stored file under a key prefix"""
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> str:
+        """Path of a local copy of the file, for readers that need one"""
+        raise NotImplementedError
+
+    def normalize_key(self, key: str) -> str:
+        return key
+
+    async def write_stream(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        """Store a file from an async byte stream, returning its size"""
+        with tempfile.SpooledTemporaryFile(max_size=8 * CHUNK_SIZE) as spool:
+            async for chunk in chunks:
+                await run_in_threadpool(spool.write, chunk)
+            spool.seek(0)
+            return await run_in_threadpool(self.save, key, spool)
+
+    async def read_stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Read a file as an async byte stream"""
+        async for chunk in iterate_in_threadpool(self.iter_chunks(key, chunk_size)):
+            yield chunk
+
+    async def delete_async(self, key: str):
+        await run_in_threadpool(self.delete, key)
+
+    async def local_path_async(self, key: str) -> str:
+        return await run_in_threadpool(self.local_path, key)
+
+
+class LocalStorage(StorageBackend):
+    """Files under a directory on this node's disk"""
+
+    def __init__(self, root: str = settings.UPLOAD_DIR):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def normalize_key(self, key: str) -> str:
+        # Datasets uploaded before storage backends stored a local path
+        path = os.path.abspath(key)
+        if path.startswith(self.root + os.sep):
+            return os.path.relpath(path, self.root).replace(os.sep, "/")
+        return key
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, self.normalize_key(key)))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def save(self, key: str, fileobj: BinaryIO) -> int:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".part"
+        with open(tmp_path, "wb") as out:
+            shutil.copyfileobj(fileobj, out, CHUNK_SIZE)
+        os.replace(tmp_path, path)
+        return os.path.getsize(path)
+
+    def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def delete(self, key: str):
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def list_keys(self, prefix: str = "") -> Iterator[Tuple[str, float]]:
+        for root, _, files in os.walk(os.path.join(self.root, prefix)):
+            for name in files:
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, self.root).replace(os.sep, "/"), os.path.getmtime(path)
+
+    def local_path(self, key: str) -> str:
+        return self._path(key)
+
+
+class S3Storage(StorageBackend):
+    """Files in an S3-compatible bucket (AWS S3, MinIO, moto server, ...).
+
+    Dataset files never change after upload, so `local_path` keeps a
+    read-through cache of downloaded blobs on local disk, evicting the
+    least recently used ones once it grows past STORAGE_CACHE_MAX_BYTES.
+    Files saved through this node are cached as they are uploaded.
+    """
+
+    def __init__(
+        self,
+        bucket: str = settings.S3_BUCKET,
+        prefix: str = settings.S3_PREFIX,
+        cache_dir: str = settings.STORAGE_CACHE_DIR,
+        cache_max_bytes: int = settings.STORAGE_CACHE_MAX_BYTES
+    ):
+        import boto3
+
+        if not bucket:
+            raise ValueError("S3_BUCKET must be set for the s3 storage backend")
+
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL or None,
+            region_name=settings.S3_REGION,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None
+        )
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.cache_max_bytes = cache_max_bytes
+        self._cache_lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def save(self, key: str, fileobj: BinaryIO) -> int:
+        # Write the cache entry first and upload from it: readers on this
+        # node (e.g. the ingest jobs) then never download the file back,
+        # and upload_fileobj closes the file it is given
+        def upload(tmp_path: str):
+            with open(tmp_path, "rb") as f:
+                # upload_fileobj switches to multipart uploads for large files
+                self.client.upload_fileobj(f, self.bucket, self._object_key(key))
+
+        return self._write_cache(key, lambda out: shutil.copyfileobj(fileobj, out, CHUNK_SIZE), upload)
+
+    def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        yield from response["Body"].iter_chunks(chunk_size)
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+        cached = self._cache_path(key)
+        if os.path.exists(cached):
+            os.remove(cached)
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def list_keys(self, prefix: str = "") -> Iterator[Tuple[str, float]]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        root = f"{self.prefix}/" if self.prefix else ""
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=root + prefix):
+            for item in page.get("Contents", []):
+                yield item["Key"][len(root):], item["LastModified"].timestamp()
+
+    def _cache_path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.cache_dir, key))
+        if not path.startswith(self.cache_dir + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def local_path(self, key: str) -> str:
+        path = self._cache_path(key)
+        if os.path.exists(path):
+            os.utime(path)  # Mark as recently used
+            return path
+
+        self._write_cache(key, lambda out: self.client.download_fileobj(self.bucket, self._object_key(key), out))
+        return path
+
+    def _write_cache(self, key: str, write: Callable, before_replace: Optional[Callable] = None) -> int:
+        """Fill the cache entry of a key through a temporary file, returning its size"""
+        path = self._cache_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                write(out)
+            size = os.path.getsize(tmp_path)
+            if before_replace:
+                before_replace(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._evict()
+        return size
+
+    def _evict(self):
+        with self._cache_lock:
+            entries = []
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if name.endswith(".part"):
+                        continue
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.cache_max_bytes:
+                    break
+                os.remove(path)
+                total -= size
+
+
+def create_storage() -> StorageBackend:
+    """Storage backend selected by STORAGE_BACKEND"""
+    if settings.STORAGE_BACKEND == "s3":
+        return S3Storage()
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage()
+    raise ValueError(f"Unknown storage backend: {settings.STORAGE_BACKEND}")
+
+
+storage = create_storage()
@@ -0,0 +1,210 @@
+import logging
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import insert, select, literal
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.dataset import Dataset
+from ..models.forecast import ForecastArtifact
+from ..models.job import Job
+from ..models.permission import ProjectPermission
+from ..models.project import Project
+from ..models.storage import StorageTombstone
+from .forecast_artifacts import live_prefixes
+from .jobs import job_handler, enqueue_job
+from .storage import storage
+
+logger = logging.getLogger(__name__)
+
+
+def _tombstone_datasets(db: Session, condition):
+    """Queue the files of matching datasets for the GC, then delete the rows"""
+    db.execute(
+        insert(StorageTombstone).from_select(
+            ["dataset_id", "project_id", "file_path", "created_at"],
+            select(Dataset.id, Dataset.project_id, Dataset.file_path, literal(datetime.utcnow())).where(condition)
+        )
+    )
+
+    # Dataset listings of the affected projects change
+    db.query(Project).filter(
+        Project.id.in_(select(Dataset.project_id).where(condition))
+    ).update({Project.updated_at: datetime.utcnow()}, synchronize_session=False)
+
+    # Artifact blobs are removed by the GC with the dataset file
+    db.query(ForecastArtifact).filter(
+        ForecastArtifact.dataset_id.in_(select(Dataset.id).where(condition))
+    ).delete(synchronize_session=False)
+
+    # Pending work on these datasets can no longer run
+    db.query(Job).filter(
+        Job.dataset_id.in_(select(Dataset.id).where(condition)),
+        Job.status == "queued"
+    ).update({Job.status: "cancelled", Job.finished_at: datetime.utcnow()}, synchronize_session=False)
+
+    return db.query(Dataset).filter(condition).delete(synchronize_session=False)
+
+
+def delete_datasets(db: Session, dataset_ids: List[str]) -> int:
+    """Delete datasets with set-based SQL; files are reclaimed by the storage GC"""
+    deleted = _tombstone_datasets(db, Dataset.id.in_(dataset_ids))
+    db.commit()
+    return deleted
+
+
+def delete_projects(db: Session, project_ids: List[str]) -> dict:
+    """Delete projects and everything under them without loading rows into the ORM"""
+    datasets = _tombstone_datasets(db, Dataset.project_id.in_(project_ids))
+
+    db.query(ProjectPermission).filter(
+        ProjectPermission.project_id.in_(project_ids)
+    ).delete(synchronize_session=False)
+
+    # Keep job history but detach it from the deleted projects
+    db.query(Job).filter(
+        Job.project_id.in_(project_ids)
+    ).update({Job.project_id: None}, synchronize_session=False)
+
+    projects = db.query(Project).filter(
+        Project.id.in_(project_ids)
+    ).delete(synchronize_session=False)
+
+    db.commit()
+    return {"projects": projects, "datasets": datasets}
+
+
+def schedule_gc(db: Session, created_by: Optional[str] = None) -> Job:
+    """Queue a storage GC run unless one is already waiting"""
+    pending = db.query(Job).filter(
+        Job.kind == "storage_gc",
+        Job.status == "queued"
+    ).first()
+    if pending:
+        return pending
+    return enqueue_job(db, "storage_gc", created_by=created_by)
+
+
+@job_handler("storage_gc")
+def storage_gc_job(ctx, payload: dict) -> dict:
+    """Background job: delete files, artifacts and derived outputs of deleted datasets.
+
+    A tombstone whose files cannot be deleted is kept for the next run
+    and counted as failed; the rest of the batch still proceeds.
+    """
+    db = SessionLocal()
+    reclaimed = 0
+    failed = []
+    try:
+        total = db.query(StorageTombstone).count()
+        while True:
+            query = db.query(StorageTombstone)
+            if failed:
+                query = query.filter(StorageTombstone.dataset_id.notin_(failed))
+            batch = query.order_by(
+                StorageTombstone.created_at
+            ).limit(settings.STORAGE_GC_BATCH_SIZE).all()
+            if not batch:
+                break
+
+            done = []
+            for tombstone in batch:
+                try:
+                    storage.delete(tombstone.file_path)
+                    for prefix in ("artifacts", "derived"):
+                        for key, _ in list(storage.list_keys(f"{prefix}/{tombstone.dataset_id}/")):
+                            storage.delete(key)
+                except Exception:
+                    logger.exception("Could not reclaim files of dataset %s", tombstone.dataset_id)
+                    failed.append(tombstone.dataset_id)
+                else:
+                    done.append(tombstone.dataset_id)
+
+            if done:
+                db.query(StorageTombstone).filter(
+                    StorageTombstone.dataset_id.in_(done)
+                ).delete(synchronize_session=False)
+                db.commit()
+
+            reclaimed += len(done)
+            ctx.progress((reclaimed + len(failed)) / max(total, reclaimed + len(failed)), f"Reclaimed {reclaimed} files")
+    finally:
+        db.close()
+
+    # Dataset ids may belong to other tenants, so only the count is reported
+    return {"reclaimed": reclaimed, "failed": len(failed)}
+
+
+@job_handler("storage_reconcile")
+def storage_reconcile_job(ctx, payload: dict) -> dict:
+    """Background job: compare the datasets table with the storage backend.
+
+    Stored files and derived outputs that no dataset references are orphans
+    and are removed unless `dry_run` is set. Datasets whose file is missing
+    are reported only. Keys span all tenants, so they go to the log and
+    the result holds counts.
+    """
+    dry_run = payload.get("dry_run", True)
+    cutoff = time.time() - settings.STORAGE_GC_GRACE_SECONDS
+
+    db = SessionLocal()
+    try:
+        referenced = {
+            storage.normalize_key(file_path): dataset_id
+            for dataset_id, file_path in db.query(Dataset.id, Dataset.file_path)
+        }
+        pending = {dataset_id for (dataset_id,) in db.query(StorageTombstone.dataset_id)}
+        artifact_prefixes = tuple(
+            prefix
+            for dataset_id, version in db.query(ForecastArtifact.dataset_id, ForecastArtifact.version)
+            for prefix in live_prefixes(dataset_id, version)
+        )
+    finally:
+        db.close()
+    dataset_ids = set(referenced.values())
+
+    ctx.progress(0.2, "Scanning storage")
+    stored = set()
+    orphan_files = []
+    orphan_caches = []
+    for key, modified in storage.list_keys():
+        stored.add(key)
+        if key.startswith("artifacts/"):
+            # Only the current and previous versions of a live dataset's artifacts are kept
+            orphan = not key.startswith(artifact_prefixes) and key.split("/")[1] not in pending
+        elif key.startswith("derived/"):
+            dataset_id = key.split("/")[1]
+            if dataset_id not in dataset_ids and dataset_id not in pending and modified < cutoff:
+                orphan_caches.append(key)
+            continue
+        else:
+            orphan = key not in referenced
+        if orphan and modified < cutoff:
+            orphan_files.append(key)
+
+    missing_files = [
+        dataset_id for key, dataset_id in referenced.items()
+        if key not in stored
+    ]
+
+    for key in orphan_files:
+        logger.info("Orphan file %s", key)
+    for key in orphan_caches:
+        logger.info("Orphan derived output %s", key)
+    for dataset_id in missing_files:
+        logger.warning("Dataset %s has no stored file", dataset_id)
+
+    if not dry_run:
+        ctx.progress(0.8, "Removing orphans")
+        for key in orphan_files + orphan_caches:
+            storage.delete(key)
+
+    return {
+        "dry_run": dry_run,
+        "orphan_files": len(orphan_files),
+        "orphan_caches": len(orphan_caches),
+        "missing_files": len(missing_files)
+    }
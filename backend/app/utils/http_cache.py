@@ -0,0 +1,53 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+
+# Per-user data: browsers may cache it, shared proxies must not
+PRIVATE_REVALIDATE = "private, no-cache"
+PRIVATE_IMMUTABLE = "private, max-age=3600, must-revalidate"
+
+def make_etag(*parts) -> str:
+    """Strong ETag from the values that identify a response's content"""
+    digest = hashlib.sha256(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match (or, without it, If-Modified-Since)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # A "-0000" zone parses as naive; HTTP dates are always UTC
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    
+    return False
+
+def cache_headers(etag: str, last_modified: Optional[datetime] = None, cache_control: str = PRIVATE_REVALIDATE) -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization"}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    return headers
+
+def set_cache_headers(response: Response, etag: str, last_modified: Optional[datetime] = None, cache_control: str = PRIVATE_REVALIDATE):
+    response.headers.update(cache_headers(etag, last_modified, cache_control))
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None, cache_control: str = PRIVATE_REVALIDATE) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, last_modified, cache_control))
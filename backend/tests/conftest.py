@@ -0,0 +1,89 @@
+import os
+import tempfile
+
+# Settings and the engine are created at import time, so point them at a
+# scratch directory before anything imports the app
+_root = tempfile.mkdtemp(prefix="defo-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_root, 'test.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(_root, "uploads")
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ["JOB_WORKERS"] = "0"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import Base, SessionLocal, engine
+from app.main import app
+from app.models.user import User
+from app.utils.security import create_access_token
+
+
+@pytest.fixture(autouse=True)
+def clean_tables():
+    yield
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="owner@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def auth_headers(user):
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.email})}"}
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def run_queued_jobs(db):
+    """Run queued jobs in this thread, as a worker would"""
+    from app.services.jobs import JobWorkerPool
+
+    pool = JobWorkerPool(workers=0)
+    while True:
+        job = pool._claim(db, "test-worker")
+        if job is None:
+            return
+        db.expunge(job)
+        pool._run(job, "test-worker")
+
+
+@pytest.fixture
+def project(client, auth_headers):
+    return client.post("/projects/", json={"name": "Demand"}, headers=auth_headers).json()
+
+
+@pytest.fixture
+def upload(client, auth_headers, project):
+    """Upload a CSV built from a DataFrame and return the dataset"""
+    def upload(df, name="sales"):
+        content = df.to_csv(index=False).encode()
+        response = client.post(
+            f"/projects/{project['id']}/datasets/upload",
+            files={"file": (f"{name}.csv", content)},
+            data={"name": name},
+            headers=auth_headers
+        )
+        assert response.status_code == 200, response.text
+        return response.json()
+    return upload
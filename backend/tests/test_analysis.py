@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.permission import ProjectPermission
+from app.models.user import User
+from app.services.datasets import derived_key
+from app.services.storage import storage
+from app.utils.security import create_access_token
+from tests.conftest import run_queued_jobs
+
+
+@pytest.fixture
+def dataset(upload):
+    rng = np.random.default_rng(0)
+    return upload(pd.DataFrame({
+        "date": np.tile(pd.date_range("2024-01-01", periods=50).strftime("%Y-%m-%d"), 4),
+        "product": np.repeat(["A", "B", "C", "D"], 50),
+        "demand": rng.poisson(20, 200)
+    }))
+
+
+@pytest.fixture
+def member_headers(db, project):
+    member = User(email="member@example.com", hashed_password="x")
+    db.add(member)
+    db.commit()
+    db.add(ProjectPermission(user_id=member.id, project_id=project["id"]))
+    db.commit()
+    return {"Authorization": f"Bearer {create_access_token({'sub': member.email})}"}
+
+
+def approx(client, dataset, headers):
+    return client.get(f"/datasets/{dataset['id']}/analysis?mode=approx", headers=headers)
+
+
+def test_approx_analysis_lifecycle(client, db, auth_headers, dataset):
+    # Sample not built yet: only the ids of the jobs to follow
+    pending = approx(client, dataset, auth_headers)
+    assert pending.status_code == 202
+    body = pending.json()
+    assert body["mode"] == "pending"
+    queued = {job["id"] for job in client.get("/jobs/", headers=auth_headers).json()["jobs"]}
+    assert {body["exact_job_id"], body["sample_job_id"]} <= queued
+
+    # Profile finished: the exact analysis from the stored profile
+    run_queued_jobs(db)
+    exact = approx(client, dataset, auth_headers)
+    assert exact.status_code == 200
+    assert exact.json()["mode"] == "exact"
+    assert exact.json()["total_rows"] == 200
+    assert "time_series_data" in exact.json()
+
+    again = client.get(
+        f"/datasets/{dataset['id']}/analysis?mode=approx",
+        headers={**auth_headers, "If-None-Match": exact.headers["etag"]}
+    )
+    assert again.status_code == 304
+
+
+def test_missing_profile_output_is_rebuilt(client, db, auth_headers, dataset):
+    approx(client, dataset, auth_headers)
+    run_queued_jobs(db)
+    exact = approx(client, dataset, auth_headers)
+    assert exact.json()["mode"] == "exact"
+
+    # e.g. a profile job that finished before profiles were stored separately:
+    # estimates from the sample while the profile runs again
+    storage.delete(derived_key(dataset["id"], "profile.json"))
+    estimate = approx(client, dataset, auth_headers)
+    assert estimate.status_code == 200
+    assert estimate.json()["mode"] == "approx"
+    assert estimate.headers["cache-control"] == "no-store"
+    assert estimate.json()["statistics"]["demand"]["count"] == 200
+
+    run_queued_jobs(db)
+    assert approx(client, dataset, auth_headers).json()["mode"] == "exact"
+
+
+def test_project_members_can_follow_but_not_cancel_shared_jobs(client, db, auth_headers, member_headers, dataset):
+    job_id = approx(client, dataset, auth_headers).json()["exact_job_id"]
+
+    assert client.get(f"/jobs/{job_id}", headers=member_headers).status_code == 200
+    assert client.post(f"/jobs/{job_id}/cancel", headers=member_headers).status_code == 403
+    assert client.post(f"/jobs/{job_id}/cancel", headers=auth_headers).status_code == 200
+
+
+def test_outsiders_cannot_see_dataset_jobs(client, db, auth_headers, dataset):
+    outsider = User(email="outsider@example.com", hashed_password="x")
+    db.add(outsider)
+    db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': outsider.email})}"}
+
+    job_id = approx(client, dataset, auth_headers).json()["exact_job_id"]
+    assert client.get(f"/jobs/{job_id}", headers=headers).status_code == 403
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.backtest_models import MODELS, make_cutoffs, evaluate_chunk
+from app.services.backtesting import run_backtest
+from tests.conftest import run_queued_jobs
+
+
+def test_mase_scale_is_in_sample_naive_error():
+    # A unit-slope line: the one-step naive error is 1, and a naive forecast
+    # h steps ahead is off by h
+    values = np.arange(40, dtype=float)[None, :]
+    cutoffs = make_cutoffs(40, horizon=4, folds=3, step=4)
+
+    scores = evaluate_chunk(values, cutoffs, 4, ["naive"], season_length=7)
+    assert scores["naive"]["mase"][0] == pytest.approx((1 + 2 + 3 + 4) / 4)
+    assert scores["naive"]["bias"][0] == pytest.approx(-2.5)
+
+
+def test_seasonal_naive_is_exact_on_periodic_series():
+    values = np.tile([5.0, 1.0, 3.0, 8.0, 2.0, 6.0, 4.0], 10)[None, :]
+    cutoffs = make_cutoffs(values.shape[1], horizon=7, folds=4, step=7)
+
+    scores = evaluate_chunk(values, cutoffs, 7, ["seasonal_naive", "naive"], season_length=7)
+    assert scores["seasonal_naive"]["mape"][0] == pytest.approx(0.0)
+    assert scores["seasonal_naive"]["mase"][0] == pytest.approx(0.0)
+    assert scores["naive"]["mase"][0] > 0
+
+
+@pytest.mark.parametrize("model", list(MODELS))
+def test_forecasts_do_not_see_past_the_cutoff(model):
+    rng = np.random.default_rng(0)
+    values = rng.poisson(20, (5, 60)).astype(float)
+    cutoffs = make_cutoffs(60, horizon=5, folds=4, step=5)
+    forecast = MODELS[model](values, cutoffs, 5, 7)
+
+    for fold, cutoff in enumerate(cutoffs):
+        changed = values.copy()
+        changed[:, cutoff:] = 1e6
+        np.testing.assert_allclose(MODELS[model](changed, cutoffs, 5, 7)[:, fold], forecast[:, fold])
+
+
+def test_serial_and_pool_results_match():
+    rng = np.random.default_rng(1)
+    values = rng.poisson(10, (30, 50)).astype(float)
+    keys = np.array([f"s{i}" for i in range(30)])
+
+    serial = run_backtest(keys, values, horizon=3, folds=2, processes=1, chunk_size=10)
+    pooled = run_backtest(keys, values, horizon=3, folds=2, processes=2, chunk_size=10)
+    assert serial["aggregate"] == pooled["aggregate"]
+    assert serial["best_model"] == pooled["best_model"]
+
+
+def test_backtest_job_keeps_per_series_scores_out_of_the_job_row(client, db, auth_headers, upload):
+    rng = np.random.default_rng(2)
+    dates = pd.date_range("2023-01-01", periods=60).strftime("%Y-%m-%d")
+    df = pd.DataFrame({
+        "date": np.tile(dates, 3),
+        "product": np.repeat(["A", "B", "C"], 60),
+        "demand": rng.poisson(20, 180)
+    })
+    dataset = upload(df)
+    run_queued_jobs(db)
+
+    job = client.post(f"/datasets/{dataset['id']}/backtest", json={"horizon": 7, "folds": 3}, headers=auth_headers).json()
+    run_queued_jobs(db)
+
+    job = client.get(f"/jobs/{job['id']}", headers=auth_headers).json()
+    assert job["status"] == "succeeded"
+    assert "series" not in job["result"]
+    assert job["result"]["series_count"] == 3
+
+    full = client.get(f"/datasets/{dataset['id']}/backtests/{job['id']}", headers=auth_headers).json()
+    assert [series["key"] for series in full["series"]] == ["A", "B", "C"]
+    assert full["aggregate"] == job["result"]["aggregate"]
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.features import DEFAULT_SPEC, compute_features, update_features, _row_hashes
+
+
+def long_frame(n_series=4, n_periods=90, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-01-01", periods=n_periods)
+    return pd.DataFrame({
+        "key": np.repeat([f"P{i}" for i in range(n_series)], n_periods),
+        "date": np.tile(dates, n_series),
+        "demand": rng.poisson(10, n_series * n_periods).astype(float),
+        "price": rng.uniform(5, 10, n_series * n_periods)
+    })
+
+
+def full_table(frame):
+    table = compute_features(frame, DEFAULT_SPEC)
+    table["_row_hash"] = _row_hashes(frame).to_numpy()
+    return table
+
+
+def assert_same_table(updated, expected):
+    pd.testing.assert_frame_equal(
+        updated.reset_index(drop=True),
+        expected.reset_index(drop=True),
+        check_exact=False, rtol=1e-9, atol=1e-9
+    )
+
+
+def test_incremental_update_matches_full_rebuild_after_edits():
+    frame = long_frame()
+    cached = full_table(frame)
+
+    edited = frame.copy()
+    edited.loc[(edited["key"] == "P1") & (edited.index % 90 == 60), "demand"] += 5
+    edited.loc[(edited["key"] == "P3") & (edited.index % 90 == 10), "price"] *= 2
+
+    assert_same_table(update_features(cached, edited), full_table(edited))
+
+
+def test_incremental_update_matches_full_rebuild_after_append_and_removal():
+    frame = long_frame()
+    cached = full_table(frame)
+
+    longer = long_frame(n_periods=100)
+    changed = pd.concat([
+        longer[longer["key"] != "P2"],
+        longer[longer["key"] == "P2"].iloc[:50]
+    ]).sort_values(["key", "date"], kind="mergesort").reset_index(drop=True)
+    changed = changed[changed["key"] != "P0"].reset_index(drop=True)
+
+    assert_same_table(update_features(cached, changed), full_table(changed))
+
+
+def test_unchanged_frame_returns_cached_table():
+    frame = long_frame()
+    cached = full_table(frame)
+    assert update_features(cached, frame) is cached
+
+
+@pytest.mark.parametrize("field", ["lags", "windows", "ewm_spans", "price_lags"])
+@pytest.mark.parametrize("value", [0, -7])
+def test_feature_request_rejects_non_positive_periods(client, auth_headers, project, field, value):
+    response = client.post(
+        "/datasets/missing/features",
+        json={field: [1, value]},
+        headers=auth_headers
+    )
+    assert response.status_code == 422
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from app.services.forecast_artifacts import artifact_prefix, fit_parameters, load_artifact, save_artifact
+from app.services.storage import storage
+
+
+def fit(db, dataset_id="ds-1", offset=0.0):
+    rng = np.random.default_rng(0)
+    values = 10 + offset + rng.normal(size=(3, 28))
+    dates = pd.date_range("2024-01-01", periods=28)
+    return save_artifact(db, dataset_id, np.array(["A", "B", "C"]), fit_parameters(values), dates)
+
+
+def stored_versions(dataset_id="ds-1"):
+    prefix = artifact_prefix(dataset_id)
+    return sorted({key[len(prefix):].split("/")[0] for key, _ in storage.list_keys(prefix)})
+
+
+def test_refit_keeps_current_and_previous_version(db):
+    fit(db)
+    fit(db, offset=5)
+    assert stored_versions() == ["v1", "v2"]
+
+    artifact = fit(db, offset=10)
+    assert artifact.version == 3
+    assert stored_versions() == ["v2", "v3"]
+
+
+def test_previous_version_stays_loadable_after_refit(db):
+    first = fit(db)
+    stale = {column.name: getattr(first, column.name) for column in first.__table__.columns}
+    fit(db, offset=5)
+
+    # A request that read the row before the refit still loads its arrays
+    loaded = load_artifact(type(first)(**stale))
+    found, missing, forecast, dates = loaded.predict(["A", "Z"], horizon=3)
+    assert found == ["A"] and missing == ["Z"]
+    assert forecast.shape == (1, 3)
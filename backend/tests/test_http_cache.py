@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from starlette.requests import Request
+
+from app.utils.http_cache import is_not_modified, make_etag
+
+
+def request(**headers):
+    return Request({
+        "type": "http",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    })
+
+
+MODIFIED = datetime(2024, 3, 1, 12, 30, 15, 250000)
+
+
+@pytest.mark.parametrize("header", [
+    "Fri, 01 Mar 2024 12:30:15 GMT",
+    "Fri, 01 Mar 2024 12:30:15 +0000",
+    "Fri, 01 Mar 2024 12:30:15 -0000",
+    "Fri, 01 Mar 2024 13:30:15 +0100",
+])
+def test_if_modified_since_matches_in_any_utc_spelling(header):
+    assert is_not_modified(request(if_modified_since=header), make_etag("x"), MODIFIED)
+
+
+def test_if_modified_since_before_last_modified():
+    header = "Fri, 01 Mar 2024 12:30:14 -0000"
+    assert not is_not_modified(request(if_modified_since=header), make_etag("x"), MODIFIED)
+
+
+def test_aware_last_modified_ignores_sub_second_part():
+    header = "Fri, 01 Mar 2024 12:30:15 GMT"
+    aware = MODIFIED.replace(tzinfo=timezone.utc).astimezone(timezone(timedelta(hours=2)))
+    assert is_not_modified(request(if_modified_since=header), make_etag("x"), aware)
+
+
+def test_if_none_match_takes_precedence():
+    etag = make_etag("dataset", 1)
+    headers = {"if_none_match": f'"other", W/{etag}', "if_modified_since": "Thu, 01 Jan 1970 00:00:00 GMT"}
+    assert is_not_modified(request(**headers), etag, MODIFIED)
+    assert not is_not_modified(request(if_none_match='"other"'), etag, MODIFIED)
+
+
+def test_unparseable_date_is_modified():
+    assert not is_not_modified(request(if_modified_since="yesterday"), make_etag("x"), MODIFIED)
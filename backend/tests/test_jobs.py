@@ -0,0 +1,159 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import SessionLocal, engine
+from app.models.job import Job
+from app.services.jobs import JobWorkerPool, enqueue_job, job_handler, job_result, request_cancel
+
+
+@job_handler("test_echo")
+def echo_job(ctx, payload):
+    ctx.progress(0.5, "Halfway")
+    return {"echo": payload.get("value")}
+
+
+@job_handler("test_fail")
+def failing_job(ctx, payload):
+    raise RuntimeError("boom")
+
+
+@pytest.fixture
+def pool():
+    return JobWorkerPool(workers=0, lease_seconds=30)
+
+
+def claim_and_run(pool, db, worker_id="worker-1"):
+    job = pool._claim(db, worker_id)
+    db.expunge(job)
+    pool._run(job, worker_id)
+    db.expire_all()
+    return db.query(Job).filter(Job.id == job.id).first()
+
+
+def test_claim_takes_lease_once(pool, db):
+    job = enqueue_job(db, "test_echo", {"value": 1})
+
+    claimed = pool._claim(db, "worker-1")
+    assert claimed.id == job.id
+    assert claimed.status == "running"
+    assert claimed.lease_owner == "worker-1"
+    assert claimed.attempts == 1
+
+    # A second worker finds nothing while the lease is live
+    assert pool._claim(db, "worker-2") is None
+
+
+def test_expired_lease_is_reclaimed(pool, db):
+    job = enqueue_job(db, "test_echo")
+    pool._claim(db, "worker-1")
+
+    db.query(Job).filter(Job.id == job.id).update({Job.lease_expires_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+
+    reclaimed = pool._claim(db, "worker-2")
+    assert reclaimed.id == job.id
+    assert reclaimed.lease_owner == "worker-2"
+    assert reclaimed.attempts == 2
+
+
+def test_success_stores_result(pool, db):
+    enqueue_job(db, "test_echo", {"value": "hi"})
+
+    job = claim_and_run(pool, db)
+    assert job.status == "succeeded"
+    assert job.progress == 1.0
+    assert job_result(job) == {"echo": "hi"}
+    assert job.lease_owner is None
+
+
+def test_failure_is_retried_then_fails(pool, db):
+    job = enqueue_job(db, "test_fail", max_attempts=2)
+
+    job = claim_and_run(pool, db)
+    assert job.status == "queued"
+    assert job.error == "boom"
+    assert job.run_after > datetime.utcnow()
+
+    # Skip the backoff
+    db.query(Job).filter(Job.id == job.id).update({Job.run_after: datetime.utcnow()})
+    db.commit()
+
+    job = claim_and_run(pool, db)
+    assert job.status == "failed"
+    assert job.attempts == 2
+
+
+def test_cancel_queued_job(db):
+    job = request_cancel(db, enqueue_job(db, "test_echo"))
+    assert job.status == "cancelled"
+    assert job.finished_at is not None
+
+
+def test_cancel_running_job(pool, db):
+    enqueue_job(db, "test_echo")
+    job = pool._claim(db, "worker-1")
+    request_cancel(db, job)
+    db.expunge(job)
+
+    # The handler stops at its next progress() call
+    pool._run(job, "worker-1")
+    db.expire_all()
+    assert db.query(Job).filter(Job.id == job.id).first().status == "cancelled"
+
+
+def test_lost_lease_does_not_overwrite(pool, db):
+    enqueue_job(db, "test_echo")
+    job = pool._claim(db, "worker-1")
+    db.query(Job).filter(Job.id == job.id).update({Job.lease_owner: "worker-2"})
+    db.commit()
+    db.refresh(job)
+    db.expunge(job)
+
+    pool._run(job, "worker-1")
+    db.expire_all()
+    job = db.query(Job).filter(Job.id == job.id).first()
+    assert job.status == "running"
+    assert job.lease_owner == "worker-2"
+
+
+def test_event_stream_releases_request_connection(client, db, user, auth_headers):
+    job = enqueue_job(db, "test_echo", created_by=user.id)
+    job_id = job.id
+    db.close()
+    checked_out = []
+
+    def finish_job():
+        # Measured while the stream is open, then the job ends so the stream does
+        time.sleep(0.3)
+        checked_out.append(engine.pool.checkedout())
+        session = SessionLocal()
+        try:
+            session.query(Job).filter(Job.id == job_id).update({Job.status: "succeeded"})
+            session.commit()
+        finally:
+            session.close()
+
+    finisher = threading.Thread(target=finish_job)
+    finisher.start()
+    with client.stream("GET", f"/jobs/{job_id}/events", headers=auth_headers, timeout=10) as response:
+        events = [line for line in response.iter_lines() if line.startswith("event: ")]
+    finisher.join()
+
+    assert events[-1] == "event: done"
+    # Polls use short-lived sessions; nothing stays checked out between them
+    assert checked_out == [0]
+
+
+def test_job_list_omits_results(pool, client, db, user, auth_headers):
+    enqueue_job(db, "test_echo", {"value": "hi"}, created_by=user.id)
+    claim_and_run(pool, db)
+
+    listed = client.get("/jobs/", headers=auth_headers).json()["jobs"]
+    assert listed[0]["status"] == "succeeded"
+    assert listed[0]["result"] is None
+
+    job = client.get(f"/jobs/{listed[0]['id']}", headers=auth_headers).json()
+    assert job["result"] == {"echo": "hi"}
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import quality
+from app.services.quality import assess_quality, infer_frequency, period_grid
+
+
+def frame(dates, demand, products=None):
+    return pd.DataFrame({
+        "date": dates,
+        "product": products if products is not None else ["A"] * len(dates),
+        "demand": demand
+    })
+
+
+def test_counts_per_product():
+    df = frame(
+        ["2024-01-01", "2024-01-02", "2024-01-02", "2024-01-05", "not a date", "2024-01-01", "2024-01-02", "2024-01-03"],
+        [5, 6, 1, -3, 4, 5, "n/a", 500],
+        ["A", "A", "A", "A", "A", "B", "B", "B"]
+    )
+    table, report = assess_quality(df, frequency="D")
+
+    a, b = report["products"]
+    assert (a["rows"], a["duplicates"], a["gaps"], a["invalid_dates"], a["negative_values"]) == (5, 1, 2, 1, 1)
+    assert (b["rows"], b["invalid_values"], b["gaps"]) == (3, 1, 0)
+    assert table[table["key"] == "A"]["demand"].tolist() == [5, 7, 0, 0, 0]
+    assert table[table["key"] == "A"]["filled"].tolist() == [False, False, True, True, True]
+    assert len(table[table["key"] == "B"]) == 3
+
+
+@pytest.mark.parametrize("day", [1, 15, 28])
+def test_monthly_data_snaps_to_its_own_month(day):
+    dates = [f"2024-{month:02d}-{day:02d}" for month in range(1, 7)]
+    table, report = assess_quality(frame(dates, [1, 2, 3, 4, 5, 6]))
+
+    assert report["frequency"] == "MS"
+    assert table["date"].dt.month.tolist() == [1, 2, 3, 4, 5, 6]
+    assert table["demand"].tolist() == [1, 2, 3, 4, 5, 6]
+    assert report["totals"]["misaligned"] == 0
+    assert report["totals"]["gaps"] == 0
+
+
+def test_month_end_frequency_keeps_dates_in_their_month():
+    dates = ["2024-01-15", "2024-02-15", "2024-03-31"]
+    table, _ = assess_quality(frame(dates, [1, 2, 3]), frequency="M")
+    assert [(d.month, d.day) for d in table["date"]] == [(1, 31), (2, 29), (3, 31)]
+    assert table["demand"].tolist() == [1, 2, 3]
+
+
+def test_weekly_end_anchored_frequency():
+    dates = ["2024-01-01", "2024-01-07", "2024-01-08"]  # Mon, Sun, Mon
+    table, _ = assess_quality(frame(dates, [1, 2, 3]), frequency="W-SUN")
+    assert table["date"].dt.strftime("%Y-%m-%d").tolist() == ["2024-01-07", "2024-01-14"]
+    assert table["demand"].tolist() == [3, 3]
+
+
+def test_off_day_rows_are_misaligned():
+    dates = pd.date_range("2024-01-01", periods=6, freq="7D").strftime("%Y-%m-%d").tolist()
+    dates[3] = "2024-01-23"  # a Tuesday among Mondays
+    _, report = assess_quality(frame(dates, [1] * 6))
+    assert report["frequency"] == "7D"
+    assert report["totals"]["misaligned"] == 1
+
+
+def test_mistyped_year_only_widens_its_own_series():
+    dates = pd.date_range("2024-01-01", periods=30).strftime("%Y-%m-%d").tolist()
+    df = pd.concat([
+        frame(dates, np.arange(30), [f"P{i}"] * 30) for i in range(50)
+    ] + [frame(["2204-01-01"], [1], ["P0"])])
+    table, report = assess_quality(df, frequency="D")
+
+    assert report["periods"] > 60000
+    assert len(table) == 49 * 30 + (report["periods"])
+
+
+def test_grid_cap(monkeypatch):
+    monkeypatch.setattr(quality.settings, "QUALITY_MAX_CELLS", 1000)
+    dates = pd.Series(pd.to_datetime(["2024-01-01", "2024-12-31"]))
+    with pytest.raises(ValueError, match="mistyped dates"):
+        period_grid(dates, "h", 1000)
+
+    df = frame(pd.date_range("2024-01-01", periods=400).strftime("%Y-%m-%d").tolist() * 3, [1] * 1200, ["A"] * 400 + ["B"] * 400 + ["C"] * 400)
+    with pytest.raises(ValueError, match="coarser frequency"):
+        assess_quality(df, frequency="D")
+
+
+@pytest.mark.parametrize("gap_fill,expected", [
+    ("ffill", [1, 1, 1, 4]),
+    ("interpolate", [1, 2, 3, 4]),
+])
+def test_gap_fill_stays_within_series(gap_fill, expected):
+    df = frame(
+        ["2024-01-01", "2024-01-04", "2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"],
+        [1, 4, "x", "x", 7, 8],
+        ["A", "A", "B", "B", "B", "B"]
+    )
+    table, _ = assess_quality(df, frequency="D", gap_fill=gap_fill)
+    assert table[table["key"] == "A"]["demand"].tolist() == expected
+    # B starts with missing values; nothing carries over from A
+    assert table[table["key"] == "B"]["demand"].isna().tolist() == [True, True, False, False]
+
+
+def test_infer_frequency():
+    keys = np.zeros(4, dtype=int)
+    assert infer_frequency(keys, pd.Series(pd.to_datetime(["2024-01-10", "2024-02-10", "2024-03-10", "2024-04-10"]))) == "MS"
+    assert infer_frequency(keys, pd.Series(pd.date_range("2024-01-01", periods=4, freq="W-MON"))) == "7D"
+
+
+@pytest.mark.parametrize("frequency", ["bogus", "3x", "0D"])
+def test_quality_route_rejects_invalid_frequency(client, auth_headers, upload, frequency):
+    dataset = upload(frame(["2024-01-01", "2024-01-02"], [1, 2]))
+    response = client.post(f"/datasets/{dataset['id']}/quality", json={"frequency": frequency}, headers=auth_headers)
+    assert response.status_code == 400
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.sampling import build_sample, approximate_analysis, _estimate
+
+
+def population(seed=7, n_strata=60):
+    """Strata of different sizes, levels and missing rates"""
+    rng = np.random.default_rng(seed)
+    sizes = np.maximum(rng.lognormal(4, 1, n_strata).astype(int), 3)
+    means = rng.normal(50, 20, n_strata)
+    values = rng.normal(np.repeat(means, sizes), 10)
+    values[rng.random(len(values)) < np.repeat(rng.uniform(0, 0.7, n_strata), sizes)] = np.nan
+    return pd.DataFrame({
+        "product": np.repeat([f"P{i}" for i in range(n_strata)], sizes),
+        "demand": values
+    })
+
+
+def test_mean_interval_coverage():
+    df = population()
+    true_mean = df["demand"].mean()
+
+    hits = []
+    for seed in range(150):
+        sample, meta = build_sample(df, "product", fraction=0.05, min_per_stratum=5, seed=seed)
+        for level in (1 / 64, 1.0):
+            low, high = _estimate(sample, meta, level, None)["statistics"]["demand"]["ci"]["mean"]
+            hits.append(low <= true_mean <= high)
+
+    # 300 intervals at 95%: well outside sampling noise if the variance is off
+    assert 0.91 <= np.mean(hits) <= 0.985
+
+
+def test_counts_are_exact():
+    df = population()
+    sample, meta = build_sample(df, "product", fraction=0.05, min_per_stratum=5)
+    stats = _estimate(sample, meta, 1 / 16, None)["statistics"]["demand"]
+    assert stats["count"] == df["demand"].notna().sum()
+    assert stats["ci"]["count"] == [stats["count"], stats["count"]]
+
+
+def test_every_stratum_contributes_at_the_smallest_level():
+    df = population()
+    sample, meta = build_sample(df, "product", fraction=0.05, min_per_stratum=5)
+    result = _estimate(sample, meta, 1 / 64, None)
+    assert result["sample_rows"] >= 2 * df["product"].nunique()
+    low, high = result["statistics"]["demand"]["ci"]["mean"]
+    assert high > low
+
+
+def test_census_interval_is_exact():
+    df = pd.DataFrame({"product": ["A"] * 5 + ["B"] * 5, "demand": [1.0, 2, 3, 4, 5, 10, 20, 30, 40, np.nan]})
+    sample, meta = build_sample(df, "product", fraction=1.0)
+    stats = _estimate(sample, meta, 1.0, None)["statistics"]["demand"]
+    assert stats["mean"] == pytest.approx(df["demand"].mean())
+    assert stats["ci"]["mean"] == [pytest.approx(stats["mean"])] * 2
+
+
+def test_constant_sample_reports_no_interval():
+    df = pd.DataFrame({"product": ["A"] * 100, "demand": [3.0] * 100})
+    sample, meta = build_sample(df, "product", fraction=0.02, min_per_stratum=2)
+    result = _estimate(sample, meta, 1.0, None)
+    assert result["statistics"]["demand"]["ci"]["mean"] is None
+    assert any("all sampled values are equal" in warning for warning in result["warnings"])
+
+
+def test_approx_analysis_metadata():
+    df = population()
+    sample, meta = build_sample(df, "product", fraction=0.05, min_per_stratum=5)
+    result = approximate_analysis(sample, meta, budget_ms=1000)
+    assert result["mode"] == "approx" and result["exact"] is False
+    assert result["total_rows"] == len(df)
+    assert 0 < result["sampling_fraction"] <= 1
@@ -0,0 +1,107 @@
+import asyncio
+import io
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from app.services.storage import LocalStorage, S3Storage
+
+
+@pytest.fixture
+def s3(tmp_path, monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="datasets")
+        yield S3Storage(
+            bucket="datasets",
+            prefix="tenant",
+            cache_dir=str(tmp_path / "cache"),
+            cache_max_bytes=25
+        )
+
+
+@pytest.fixture
+def local(tmp_path):
+    return LocalStorage(str(tmp_path / "files"))
+
+
+@pytest.fixture(params=["local", "s3"])
+def backend(request):
+    return request.getfixturevalue(request.param)
+
+
+def read(backend, key):
+    return b"".join(backend.iter_chunks(key, chunk_size=4))
+
+
+def test_save_read_list_delete(backend):
+    assert backend.save("p1/a.csv", io.BytesIO(b"date,demand\n")) == 12
+    backend.save("p1/b.csv", io.BytesIO(b"x"))
+    backend.save("p2/c.csv", io.BytesIO(b"y"))
+
+    assert backend.exists("p1/a.csv")
+    assert read(backend, "p1/a.csv") == b"date,demand\n"
+    assert sorted(key for key, _ in backend.list_keys("p1/")) == ["p1/a.csv", "p1/b.csv"]
+    with open(backend.local_path("p1/a.csv"), "rb") as f:
+        assert f.read() == b"date,demand\n"
+
+    backend.delete("p1/a.csv")
+    assert not backend.exists("p1/a.csv")
+    assert sorted(key for key, _ in backend.list_keys()) == ["p1/b.csv", "p2/c.csv"]
+
+
+def test_streams(backend):
+    async def chunks():
+        for part in (b"ab", b"cd", b"ef"):
+            yield part
+
+    async def roundtrip():
+        await backend.write_stream("p1/stream.csv", chunks())
+        return b"".join([chunk async for chunk in backend.read_stream("p1/stream.csv", chunk_size=4)])
+
+    assert asyncio.run(roundtrip()) == b"abcdef"
+
+
+def test_s3_keys_live_under_prefix(s3):
+    s3.save("p1/a.csv", io.BytesIO(b"abc"))
+    listed = s3.client.list_objects_v2(Bucket="datasets")["Contents"]
+    assert [item["Key"] for item in listed] == ["tenant/p1/a.csv"]
+
+
+def test_s3_save_seeds_cache(s3, monkeypatch):
+    s3.save("p1/a.csv", io.BytesIO(b"0123456789"))
+
+    def no_download(*args, **kwargs):
+        raise AssertionError("cached file was downloaded again")
+
+    monkeypatch.setattr(s3.client, "download_fileobj", no_download)
+    with open(s3.local_path("p1/a.csv"), "rb") as f:
+        assert f.read() == b"0123456789"
+
+
+def test_s3_cache_evicts_least_recently_used(s3):
+    for name in ("a", "b", "c"):
+        s3.save(f"p1/{name}.csv", io.BytesIO(b"0123456789"))
+        os.utime(s3._cache_path(f"p1/{name}.csv"), (0, {"a": 1, "b": 2, "c": 3}[name]))
+
+    # 30 bytes against a 25 byte budget: the oldest entry goes
+    s3._evict()
+    assert not os.path.exists(s3._cache_path("p1/a.csv"))
+    assert os.path.exists(s3._cache_path("p1/c.csv"))
+
+    # Reading it again downloads a fresh copy and evicts the next oldest
+    with open(s3.local_path("p1/a.csv"), "rb") as f:
+        assert f.read() == b"0123456789"
+    assert not os.path.exists(s3._cache_path("p1/b.csv"))
+
+
+def test_s3_delete_drops_cached_copy(s3):
+    s3.save("p1/a.csv", io.BytesIO(b"abc"))
+    path = s3.local_path("p1/a.csv")
+    s3.delete("p1/a.csv")
+    assert not os.path.exists(path)
+    assert not s3.exists("p1/a.csv")
@@ -0,0 +1,106 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from app.models.dataset import Dataset
+from app.models.job import Job
+from app.models.storage import StorageTombstone
+from app.services import storage_gc
+from app.services.forecast_artifacts import artifact_prefix, fit_parameters, save_artifact
+from app.services.storage import storage
+from tests.conftest import run_queued_jobs
+
+
+def sales():
+    return pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=20).strftime("%Y-%m-%d"),
+        "demand": range(20)
+    })
+
+
+def test_reconcile_requires_admin(client, db, user, auth_headers):
+    response = client.post("/storage/reconcile", headers=auth_headers)
+    assert response.status_code == 403
+
+    user.is_admin = True
+    db.commit()
+    response = client.post("/storage/reconcile", headers=auth_headers)
+    assert response.status_code == 200
+
+
+def test_reconcile_result_holds_counts_not_keys(client, db, user, auth_headers, monkeypatch):
+    user.is_admin = True
+    db.commit()
+    storage.save("orphan-of-another-tenant.csv", io.BytesIO(b"a,b\n"))
+    monkeypatch.setattr(storage_gc.settings, "STORAGE_GC_GRACE_SECONDS", -60)
+
+    job = client.post("/storage/reconcile", headers=auth_headers).json()
+    run_queued_jobs(db)
+
+    result = client.get(f"/jobs/{job['id']}", headers=auth_headers).json()["result"]
+    assert "orphan-of-another-tenant.csv" not in str(result)
+    assert result["orphan_files"] >= 1
+
+
+def test_gc_keeps_tombstones_whose_delete_failed(client, db, auth_headers, upload, monkeypatch):
+    first, second = upload(sales(), "first"), upload(sales(), "second")
+    run_queued_jobs(db)
+    broken_path = db.query(Dataset.file_path).filter(Dataset.id == first["id"]).scalar()
+    kept_path = db.query(Dataset.file_path).filter(Dataset.id == second["id"]).scalar()
+    assert list(storage.list_keys(f"derived/{second['id']}/"))
+
+    delete = storage.delete
+
+    def flaky_delete(key):
+        if key == broken_path:
+            raise OSError("permission denied")
+        delete(key)
+
+    monkeypatch.setattr(storage_gc.storage, "delete", flaky_delete)
+    response = client.post(
+        "/datasets/bulk-delete",
+        json={"dataset_ids": [first["id"], second["id"]]},
+        headers=auth_headers
+    )
+    gc_job_id = response.json()["gc_job_id"]
+    run_queued_jobs(db)
+
+    job = db.query(Job).filter(Job.id == gc_job_id).one()
+    assert job.status == "succeeded"
+    assert json.loads(job.result) == {"reclaimed": 1, "failed": 1}
+    assert [t.dataset_id for t in db.query(StorageTombstone)] == [first["id"]]
+    assert not storage.exists(kept_path)
+    assert not list(storage.list_keys(f"derived/{second['id']}/"))
+
+
+def test_reconcile_removes_derived_outputs_of_unknown_datasets(client, db, user, auth_headers, upload, monkeypatch):
+    user.is_admin = True
+    db.commit()
+    dataset = upload(sales())
+    run_queued_jobs(db)
+    storage.save("derived/gone/sample/meta.json", io.BytesIO(b"{}"))
+    monkeypatch.setattr(storage_gc.settings, "STORAGE_GC_GRACE_SECONDS", -60)
+
+    client.post("/storage/reconcile?dry_run=false", headers=auth_headers)
+    run_queued_jobs(db)
+
+    assert not storage.exists("derived/gone/sample/meta.json")
+    assert list(storage.list_keys(f"derived/{dataset['id']}/"))
+
+
+def test_reconcile_keeps_previous_artifact_version(client, db, user, auth_headers, upload, monkeypatch):
+    user.is_admin = True
+    db.commit()
+    dataset = upload(sales())
+    dates = pd.date_range("2024-01-01", periods=14)
+    for _ in range(2):
+        save_artifact(db, dataset["id"], np.array(["all"]), fit_parameters(np.ones((1, 14))), dates)
+    monkeypatch.setattr(storage_gc.settings, "STORAGE_GC_GRACE_SECONDS", -60)
+
+    client.post("/storage/reconcile?dry_run=false", headers=auth_headers)
+    run_queued_jobs(db)
+
+    assert list(storage.list_keys(artifact_prefix(dataset["id"], 1)))
+    assert list(storage.list_keys(artifact_prefix(dataset["id"], 2)))
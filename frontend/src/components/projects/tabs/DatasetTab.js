@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
+import { useJobProgress } from '../../../hooks/useJobProgress';
 
 const DatasetTab = ({ projectId }) => {
   const [datasets, setDatasets] = useState([]);
@@ -12,11 +13,28 @@ const DatasetTab = ({ projectId }) => {
   const [selectedDataset, setSelectedDataset] = useState(null);
   const [previewData, setPreviewData] = useState(null);
   const [analysisData, setAnalysisData] = useState(null);
+  const [profileJobId, setProfileJobId] = useState(null);
+  const [profilingDataset, setProfilingDataset] = useState(null);
+  const [analysisError, setAnalysisError] = useState('');
+  const { job: profileJob, error: profileError, finished: profileFinished } = useJobProgress(profileJobId);
 
   useEffect(() => {
     fetchDatasets();
   }, [projectId]);
 
+  // Show the profile once its background job has finished
+  useEffect(() => {
+    if (!profileFinished || !profilingDataset) return;
+
+    if (profileJob.status === 'succeeded') {
+      fetchProfile(profilingDataset);
+    } else {
+      setAnalysisError(profileJob.error || `Analysis ${profileJob.status}`);
+    }
+    setProfileJobId(null);
+    setProfilingDataset(null);
+  }, [profileFinished]);
+
   const fetchDatasets = async () => {
     setLoading(true);
     try {
@@ -93,16 +111,38 @@ const DatasetTab = ({ projectId }) => {
     }
   };
 
+  const fetchProfile = async (dataset) => {
+    const token = localStorage.getItem('token');
+    const response = await axios.get(`http://localhost:8000/datasets/${dataset.id}/profile`, {
+      headers: { Authorization: `Bearer ${token}` }
+    });
+    setAnalysisData(response.data);
+    setSelectedDataset(dataset);
+  };
+
   const handleAnalyzeDataset = async (dataset) => {
+    setAnalysisError('');
     try {
-      const token = localStorage.getItem('token');
-      const response = await axios.get(`http://localhost:8000/datasets/${dataset.id}/analysis`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setAnalysisData(response.data);
-      setSelectedDataset(dataset);
+      await fetchProfile(dataset);
     } catch (error) {
-      console.error('Error analyzing dataset:', error);
+      if (error.response?.status !== 404) {
+        console.error('Error analyzing dataset:', error);
+        setAnalysisError('Failed to load analysis');
+        return;
+      }
+
+      // Not profiled yet: run the analysis as a background job and follow it
+      try {
+        const token = localStorage.getItem('token');
+        const response = await axios.post(`http://localhost:8000/datasets/${dataset.id}/profile`, null, {
+          headers: { Authorization: `Bearer ${token}` }
+        });
+        setProfilingDataset(dataset);
+        setProfileJobId(response.data.id);
+      } catch (error) {
+        console.error('Error starting analysis:', error);
+        setAnalysisError('Failed to start analysis');
+      }
     }
   };
 
@@ -166,6 +206,10 @@ const DatasetTab = ({ projectId }) => {
         </div>
       ) : (
         <div className="space-y-6">
+          {analysisError && (
+            <div className="bg-red-50 text-red-700 px-4 py-2 rounded text-sm">{analysisError}</div>
+          )}
+
           {/* Dataset List */}
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-4">
             {datasets.map((dataset) => (
@@ -200,6 +244,19 @@ const DatasetTab = ({ projectId }) => {
                     Analyze
                   </button>
                 </div>
+                {profilingDataset?.id === dataset.id && (
+                  <div className="mt-3">
+                    <div className="w-full bg-gray-200 rounded h-2">
+                      <div
+                        className="bg-purple-500 h-2 rounded"
+                        style={{ width: `${Math.round((profileJob?.progress || 0) * 100)}%` }}
+                      />
+                    </div>
+                    <p className="text-xs text-gray-500 mt-1">
+                      {profileError || profileJob?.message || 'Queued...'}
+                    </p>
+                  </div>
+                )}
               </div>
             ))}
           </div>
@@ -0,0 +1,65 @@
+import { useState, useEffect } from 'react';
+
+const TERMINAL_STATUSES = ['succeeded', 'failed', 'cancelled'];
+
+// Follows a background job through its Server-Sent Events stream.
+// EventSource cannot send the Authorization header, so the stream is read with fetch.
+export const useJobProgress = (jobId) => {
+  const [job, setJob] = useState(null);
+  const [error, setError] = useState('');
+
+  useEffect(() => {
+    if (!jobId) return undefined;
+
+    const controller = new AbortController();
+
+    const follow = async () => {
+      try {
+        const token = localStorage.getItem('token');
+        const response = await fetch(`http://localhost:8000/jobs/${jobId}/events`, {
+          headers: { Authorization: `Bearer ${token}` },
+          signal: controller.signal
+        });
+
+        if (!response.ok) {
+          setError('Failed to follow job progress');
+          return;
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+          const { value, done } = await reader.read();
+          if (done) break;
+
+          buffer += decoder.decode(value, { stream: true });
+          const events = buffer.split('\n\n');
+          buffer = events.pop();
+
+          events.forEach((event) => {
+            const lines = event.split('\n');
+            const type = lines.find((line) => line.startsWith('event: '))?.slice(7);
+            const data = lines.find((line) => line.startsWith('data: '))?.slice(6);
+            if (type === 'progress' && data) {
+              setJob(JSON.parse(data));
+            }
+          });
+        }
+      } catch (error) {
+        if (error.name !== 'AbortError') {
+          console.error('Error following job:', error);
+          setError('Failed to follow job progress');
+        }
+      }
+    };
+
+    follow();
+    return () => controller.abort();
+  }, [jobId]);
+
+  const finished = job ? TERMINAL_STATUSES.includes(job.status) : false;
+
+  return { job, error, finished };
+};